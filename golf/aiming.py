@@ -1,19 +1,28 @@
 import numpy as np
-import scipy.stats
-import pygame
 
-SCREEN_WIDTH, SCREEN_HEIGHT = 1200, 800
-DECAY_RATE = 0.95
+
+def sample_landings(positions, distance, horizontal_std, vertical_std, angle, noise):
+    # landing positions of a batch of shots, the reference for how shots are sampled: mean + L @ noise, where
+    # L = R diag(horizontal_std, vertical_std) and R rotates by the aim, so that L @ L.T is the rotated covariance of
+    # AimingSystem._get_cov_matrix. written out so no 2x2 matrices are built. noise holds one standard normal pair
+    # per shot, shape (..., 2)
+    cos, sin = np.cos(angle), np.sin(angle)
+    horizontal = horizontal_std * noise[..., 0]
+    vertical = vertical_std * noise[..., 1]
+    x = positions[..., 0] + distance * cos + horizontal * cos + vertical * sin
+    y = positions[..., 1] + distance * sin - horizontal * sin + vertical * cos
+    return np.stack([x, y], axis=-1)
+
 
 class AimingSystem:
     def __init__(self, params):
         self.params = params
         self.current_club = 'Driver'
         self.current_lie = 'Teebox'
-        self.trail_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         self.prev_target = None
 
     def draw_arrow(self, screen, ball_pos, target_pos):
+        import pygame
         direction = np.array(target_pos) - ball_pos
         magnitude = np.linalg.norm(direction)
         unit_vector = direction / magnitude
@@ -48,6 +57,7 @@ class AimingSystem:
         return rotated_cov
 
     def _draw_gaussian_distribution(self, screen, mean, cov):
+        import pygame
         size = 7 * int(np.sqrt(np.max(cov))) # Define the size of the surface
 
         center = size // 2
@@ -59,9 +69,9 @@ class AimingSystem:
         x, y = np.meshgrid(np.linspace(-center, center, size), np.linspace(-center, center, size))
         pos = np.dstack((x, y))
         
-        # Generate the Gaussian distribution
-        rv = scipy.stats.multivariate_normal([0, 0], cov)
-        pdf_values = rv.pdf(pos)
+        # Generate the Gaussian distribution (only the shape matters since it is normalized by its maximum)
+        inv_cov = np.linalg.inv(cov)
+        pdf_values = np.exp(-0.5 * np.einsum('...i,ij,...j->...', pos, inv_cov, pos))
         pdf_values = (pdf_values / pdf_values.max() * 255).astype(np.uint8)
 
 
@@ -1,6 +1,6 @@
 import numpy as np
 import pygame
-from ui import draw_ui
+from .ui import draw_ui
 
 
 WHITE = (255, 255, 255)
@@ -0,0 +1,98 @@
+# ------------------------------------------------------------------------------------
+# File: batch_sim.py
+# Description: This file contains the BatchSim class, which plays shots for whole batches of balls at once with
+# NumPy: landings are sampled from the rotated Gaussians of the profile and their lies are found with vectorized
+# terrain lookups. It follows the same rules as GolfSim (penalty of 2 strokes for out of bounds and water, the hole
+# is complete once the ball lands on the green) and is the building block of planners and batch simulators.
+# -------------------------------------------------------------------------------------
+
+# import packages
+import numpy as np
+from .aiming import sample_landings
+from .constants import LIES, TERRAIN_LIES, OUT_OF_BOUNDS, WATER_HAZARD, GREEN, HOLE, FLAG
+from .roll import roll_speed
+
+# index in LIES of each terrain class, for vectorized lookups
+TERRAIN_LIE_INDEX = np.array(TERRAIN_LIES)
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def profile_arrays(profile):
+    # turn the nested profile dict into (clubs, lies) arrays of distances and standard deviations
+    clubs = list(profile.keys())
+    distance = np.array([[profile[club][lie]["distance"] for lie in LIES] for club in clubs], dtype=float)
+    horizontal_std = np.array([[profile[club][lie]["horizontal_std"] for lie in LIES] for club in clubs], dtype=float)
+    vertical_std = np.array([[profile[club][lie]["vertical_std"] for lie in LIES] for club in clubs], dtype=float)
+    return clubs, distance, horizontal_std, vertical_std
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class BatchSim:
+    def __init__(self, profile, horizon=10, roll=False):
+        self.clubs, self.distance, self.horizontal_std, self.vertical_std = profile_arrays(profile)
+        # whether balls roll after landing (see roll.py)
+        self.roll = roll
+        # rollouts stop after this many shots, the strokes left are then estimated from the distance to the hole
+        self.horizon = horizon
+
+    def play_shots(self, course, positions, lies, clubs, angles, noise):
+        # hit a batch of balls. positions (n, 2), lies (n,) as indices into LIES, clubs (n,) club indices,
+        # angles (n,) radians and noise (n, 2) standard normal draws. returns the landings, their terrain classes,
+        # the strokes added, whether the hole is complete, and the positions and lies to play the next shot from
+        distance = self.distance[clubs, lies]
+        landings = sample_landings(positions, distance, self.horizontal_std[clubs, lies],
+                                   self.vertical_std[clubs, lies], angles, noise)
+        terrain = course.get_terrain_at(landings)
+        if self.roll:
+            landings, terrain = course.roll_fields.roll(landings, angles, roll_speed(distance), terrain)
+
+        # out of bounds and water hazards cost 2 strokes and the ball is played again from where it was
+        penalty = (terrain == OUT_OF_BOUNDS) | (terrain == WATER_HAZARD)
+        holed = (terrain == GREEN) | (terrain == HOLE) | (terrain == FLAG)
+        strokes = np.where(penalty, 2, 1)
+
+        moved = ~penalty & ~holed
+        next_positions = np.where(moved[:, None], landings, positions)
+        next_lies = np.where(moved, TERRAIN_LIE_INDEX[terrain], lies)
+        return landings, terrain, strokes, holed, next_positions, next_lies
+
+    def greedy_actions(self, course, positions, lies):
+        # default policy: aim at the hole with the club whose distance is closest to the distance left
+        delta = np.asarray(course.green.hole_position, dtype=float) - positions
+        remaining = np.hypot(delta[:, 0], delta[:, 1])
+        clubs = np.abs(self.distance[:, lies] - remaining).argmin(axis=0)
+        angles = np.arctan2(delta[:, 1], delta[:, 0])
+        return clubs, angles
+
+    def estimate_strokes(self, course, positions, lies):
+        # cheap estimate of the strokes left: at least one, plus the distance left in units of the longest club
+        delta = np.asarray(course.green.hole_position, dtype=float) - positions
+        remaining = np.hypot(delta[:, 0], delta[:, 1])
+        return 1 + remaining / self.distance[:, lies].max(axis=0)
+
+    def rollout(self, course, positions, lies, rng):
+        # play every ball with the greedy policy until it is on the green (or the horizon is reached) and return
+        # the number of strokes it took
+        positions = np.array(positions, dtype=float)
+        lies = np.array(lies)
+        strokes = np.zeros(len(positions))
+        active = np.arange(len(positions))
+
+        for _ in range(self.horizon):
+            if len(active) == 0:
+                break
+            clubs, angles = self.greedy_actions(course, positions[active], lies[active])
+            _, _, added, holed, next_positions, next_lies = self.play_shots(
+                course, positions[active], lies[active], clubs, angles, rng.standard_normal((len(active), 2)))
+            strokes[active] += added
+            positions[active] = next_positions
+            lies[active] = next_lies
+            active = active[~holed]
+
+        if len(active):
+            strokes[active] += self.estimate_strokes(course, positions[active], lies[active])
+        return strokes
@@ -0,0 +1,226 @@
+# ------------------------------------------------------------------------------------
+# File: caddie.py
+# Description: This file contains the Caddie, which recommends shots in the interactive game. From the current ball
+# position and lie, a cross-entropy search looks over all clubs and aim angles: every iteration samples a
+# population of (club, angle) actions from a categorical distribution over clubs and a Gaussian over the aim of each
+# club, simulates a batch of landings (and greedy rollouts to the hole) for each of them, and refits the
+# distributions to the best actions. Simulated outcomes are accumulated per club and degree of aim, so the ranking
+# of actions by expected strokes (or by penalty risk) sharpens with every iteration. The aim the player is currently
+# pointing at is simulated as well, and re-evaluated whenever the mouse moves to a new degree of aim.
+#
+# The search runs in a separate process, so the 120 FPS game loop never waits for it: the game only posts the
+# position and the aim to a queue and picks up the latest results once per frame.
+# -------------------------------------------------------------------------------------
+
+# import packages
+import math
+import multiprocessing
+import os
+import queue
+import numpy as np
+from .batch_sim import BatchSim
+from .constants import DEFAULT_PROFILE, LIES
+from .course_library import CourseLibrary
+from .planner import simulate_actions
+from .sim import load_profile
+
+# objectives the actions can be ranked by
+OBJECTIVES = ("strokes", "risk")
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class CaddieSearch:
+    def __init__(self, batch_sim, course, ball_pos, lie, objective="strokes", rng=None, population=64, batch_size=16,
+                 elite_fraction=0.2, smoothing=0.5, max_iterations=30):
+        self.batch_sim = batch_sim
+        self.course = course
+        self.ball_pos = np.asarray(ball_pos, dtype=float)
+        self.lie = LIES.index(lie)
+        self.objective = objective
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.population = population
+        self.batch_size = batch_size
+        self.num_elites = max(1, int(population * elite_fraction))
+        self.smoothing = smoothing
+        self.max_iterations = max_iterations
+        self.iterations = 0
+
+        # search distributions: clubs are categorical, aims are Gaussian offsets (radians) from the direction of the
+        # hole, one per club
+        num_clubs = len(batch_sim.clubs)
+        hole = np.asarray(course.green.hole_position, dtype=float)
+        self.hole_angle = math.atan2(hole[1] - self.ball_pos[1], hole[0] - self.ball_pos[0])
+        self.club_probs = np.full(num_clubs, 1 / num_clubs)
+        self.offset_mean = np.zeros(num_clubs)
+        self.offset_std = np.full(num_clubs, math.radians(30))
+
+        # simulated outcomes per club and degree of aim
+        self.counts = np.zeros((num_clubs, 360))
+        self.sums = np.zeros((num_clubs, 360))
+        self.penalties = np.zeros((num_clubs, 360))
+
+    @property
+    def converged(self):
+        best = self.club_probs.argmax()
+        return self.iterations >= self.max_iterations or \
+            (self.club_probs[best] > 0.95 and self.offset_std[best] < math.radians(1))
+
+    def simulate(self, clubs, angles):
+        # simulate batch_size shots of every action and accumulate the outcomes in their (club, degree) bins
+        actions = np.stack([clubs, angles], axis=1)
+        sums, _, penalties = simulate_actions(self.batch_sim, self.course, self.ball_pos, self.lie, actions,
+                                              self.batch_size, self.rng)
+        degrees = np.round(np.degrees(angles)).astype(int) % 360
+        np.add.at(self.counts, (clubs, degrees), self.batch_size)
+        np.add.at(self.sums, (clubs, degrees), sums)
+        np.add.at(self.penalties, (clubs, degrees), penalties)
+        return self.values(sums / self.batch_size, penalties / self.batch_size)
+
+    def values(self, strokes, risk):
+        # lower is better. ranking by risk breaks ties by expected strokes
+        return strokes if self.objective == "strokes" else risk + 1e-3 * strokes
+
+    def step(self):
+        # one iteration of the cross-entropy method
+        clubs = self.rng.choice(len(self.club_probs), size=self.population, p=self.club_probs)
+        offsets = self.offset_mean[clubs] + self.offset_std[clubs] * self.rng.standard_normal(self.population)
+        values = self.simulate(clubs, self.hole_angle + offsets)
+
+        # refit the distributions to the elite actions, smoothed so that a noisy iteration cannot collapse them
+        elites = np.argsort(values)[:self.num_elites]
+        frequencies = np.bincount(clubs[elites], minlength=len(self.club_probs)) / self.num_elites
+        self.club_probs = (1 - self.smoothing) * self.club_probs + self.smoothing * frequencies
+        self.club_probs = np.maximum(self.club_probs, 1e-3)
+        self.club_probs /= self.club_probs.sum()
+        for club in np.unique(clubs[elites]):
+            elite_offsets = offsets[elites][clubs[elites] == club]
+            self.offset_mean[club] = (1 - self.smoothing) * self.offset_mean[club] + self.smoothing * elite_offsets.mean()
+            std = elite_offsets.std() if len(elite_offsets) > 1 else self.offset_std[club] / 2
+            self.offset_std[club] = max((1 - self.smoothing) * self.offset_std[club] + self.smoothing * std, math.radians(0.5))
+        self.iterations += 1
+
+    def evaluate_aim(self, club, angle, repeats=4):
+        # simulate the player's current aim and return its expected strokes, penalty risk and number of simulations
+        self.simulate(np.full(repeats, club), np.full(repeats, angle))
+        return self.outcome(club, round(math.degrees(angle)) % 360)
+
+    def outcome(self, club, degree):
+        count = self.counts[club, degree]
+        return float(self.sums[club, degree] / count), float(self.penalties[club, degree] / count), int(count)
+
+    def ranked(self, k=3, min_count=None):
+        # the best aim of every club with enough simulations, best clubs first: (club index, angle, expected
+        # strokes, penalty risk, simulations)
+        min_count = 4 * self.batch_size if min_count is None else min_count
+        enough = self.counts >= min_count
+        count = np.maximum(self.counts, 1)
+        values = np.where(enough, self.values(self.sums / count, self.penalties / count), np.inf)
+        best_degrees = values.argmin(axis=1)
+        clubs = [club for club in np.argsort(values[np.arange(len(values)), best_degrees]) if enough[club, best_degrees[club]]]
+        return [(int(club), math.radians(best_degrees[club]), *self.outcome(club, best_degrees[club])) for club in clubs[:k]]
+
+
+class Caddie:
+    def __init__(self, profile_file=DEFAULT_PROFILE, objective="strokes"):
+        self.clubs = list(load_profile(profile_file).keys())
+        self.objective = objective
+        # the worker is spawned from a clean interpreter, it only needs the NumPy simulator
+        context = multiprocessing.get_context("spawn")
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=caddie_worker, args=(profile_file, self.requests, self.results), daemon=True)
+        self.process.start()
+
+        # what was last sent to the worker, and the latest advice for the current position
+        self.version = 0
+        self.position = None
+        self.aim = None
+        self.advice = None
+
+    def toggle_objective(self):
+        self.objective = OBJECTIVES[(OBJECTIVES.index(self.objective) + 1) % len(OBJECTIVES)]
+
+    def update(self, course, ball_pos, lie, club, aim_angle):
+        # post the position and aim of the player to the worker, only when they change (never blocks)
+        position = (course.par, course.difficulty, course.seed, round(float(ball_pos[0]), 1), round(float(ball_pos[1]), 1),
+                    lie, self.objective)
+        if position != self.position:
+            self.version += 1
+            self.position = position
+            self.aim = None
+            self.advice = None
+            self.requests.put(("position", self.version, position))
+        aim = (self.clubs.index(club), round(math.degrees(aim_angle)) % 360)
+        if aim != self.aim:
+            self.aim = aim
+            self.requests.put(("aim", self.version, aim))
+
+    def poll(self):
+        # latest advice for the current position, or None if the worker has not reported on it yet
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return self.advice
+            if result["version"] == self.version:
+                self.advice = result
+
+    def close(self):
+        self.requests.put(None)
+        self.process.join(timeout=1)
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def caddie_worker(profile_file, requests, results):
+    # the game has priority over the search when they share a core
+    if hasattr(os, "nice"):
+        os.nice(10)
+    batch_sim = BatchSim(load_profile(profile_file))
+    libraries = {}
+    # aim: the player's aim waiting to be simulated, player_aim: the last aim of the player
+    search, version, aim, player_aim = None, 0, None, None
+
+    while True:
+        # wait while there is nothing to do, otherwise pick up whatever arrived during the last iteration
+        idle = search is None or (search.converged and aim is None)
+        messages = [requests.get()] if idle else []
+        while True:
+            try:
+                messages.append(requests.get_nowait())
+            except queue.Empty:
+                break
+
+        for message in messages:
+            if message is None:
+                return
+            kind, version, payload = message
+            if kind == "position":
+                par, difficulty, seed, x, y, lie, objective = payload
+                search, aim, player_aim = None, None, None
+                if seed is not None and lie in LIES:
+                    library = libraries.setdefault((par, difficulty), CourseLibrary(par=par, difficulty=difficulty, cache_size=2))
+                    search = CaddieSearch(batch_sim, library.get(seed), (x, y), lie, objective)
+            elif kind == "aim":
+                aim = payload
+        if search is None:
+            continue
+
+        # the player's aim first, so that it refreshes quickly while the mouse moves, then one search iteration
+        if aim is not None:
+            search.evaluate_aim(aim[0], math.radians(aim[1]))
+            player_aim, aim = aim, None
+        if not search.converged:
+            search.step()
+        results.put({
+            "version": version,
+            "objective": search.objective,
+            "iterations": search.iterations,
+            "converged": search.converged,
+            "ranked": [(batch_sim.clubs[club], *rest) for club, *rest in search.ranked()],
+            "aim": None if player_aim is None else
+                (batch_sim.clubs[player_aim[0]], math.radians(player_aim[1]), *search.outcome(*player_aim)),
+        })
@@ -0,0 +1,181 @@
+# ------------------------------------------------------------------------------------
+# File: calibrate.py
+# Description: This file fits player profiles to shot logs. A shot is hit from ball with a club, a lie and an aim
+# angle, and lands at ball + distance * (cos, sin) + L z, where L rotates the diagonal of the horizontal and vertical
+# standard deviations by the aim (see sample_landings in aiming.py). Rotating the displacement back by the aim
+# isolates the two independent noise components, so the distance and both standard deviations of every
+# (club, lie) pair can be estimated from running sums which are updated chunk by chunk. Memory only depends on
+# the chunk size, not on the length of the logs.
+#
+# Shot logs are rollout recordings (see rollouts.py) or CSV files with the columns
+# club, lie, ball_x, ball_y, aim, landing_x, landing_y (club and lie by name, aim in radians).
+#
+# Usage:
+#   python -m golf.calibrate rollouts/player shots.csv --profile golf/profile.json --output player_profile.json
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import csv
+import itertools
+import os
+import numpy as np
+from .constants import DEFAULT_PROFILE, LIES, TERRAIN_LIES
+from .rollouts import RolloutReader
+from .sim import load_profile
+
+# running sums kept per (club, lie): count, along, p0^2, p0 q0, q0^2, p1^2, p1 q1, q1^2, p0 p1, p0 q1 + p1 q0, q0 q1
+NUM_SUMS = 11
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def iter_recording_chunks(directory, clubs):
+    # yield (clubs, lies, ball, aim, landing) arrays for every chunk of a rollout recording. clubs are mapped from the
+    # recording's club list to the given one. recordings without a club list are assumed to use the given clubs
+    reader = RolloutReader(directory)
+    recorded_clubs = reader.metadata.get("clubs")
+    if recorded_clubs is None:
+        recorded_clubs = clubs
+    # indices outside the recorded club list (e.g. -1) map to -1 as well, and are skipped
+    club_map = np.array([clubs.index(club) if club in clubs else -1 for club in recorded_clubs] + [-1])
+    lie_map = np.array(TERRAIN_LIES)
+    for index in range(len(reader.chunks)):
+        column = lambda name: np.asarray(reader.chunk(index, name))
+        recorded = column("club").astype(int)
+        recorded = np.where((recorded >= 0) & (recorded < len(recorded_clubs)), recorded, -1)
+        # lies are stored as terrain classes
+        yield (club_map[recorded], lie_map[column("lie")],
+               np.stack([column("ball_x"), column("ball_y")], axis=1).astype(float), column("aim").astype(float),
+               np.stack([column("landing_x"), column("landing_y")], axis=1).astype(float))
+
+def iter_csv_chunks(path, clubs, chunk_size=100000):
+    # yield (clubs, lies, ball, aim, landing) arrays for every chunk_size rows of a CSV shot log
+    club_ids = {club: index for index, club in enumerate(clubs)}
+    lie_ids = {lie: index for index, lie in enumerate(LIES)}
+    with open(path, "r", newline="") as file:
+        reader = csv.DictReader(file)
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            values = np.array([[float(row[name]) for name in ("ball_x", "ball_y", "aim", "landing_x", "landing_y")]
+                               for row in rows]).reshape(-1, 5)
+            yield (np.array([club_ids.get(row["club"], -1) for row in rows]),
+                   np.array([lie_ids.get(row["lie"], -1) for row in rows]),
+                   values[:, 0:2], values[:, 2], values[:, 3:5])
+
+def iter_shot_chunks(path, clubs, chunk_size=100000):
+    if os.path.isdir(path):
+        return iter_recording_chunks(path, clubs)
+    return iter_csv_chunks(path, clubs, chunk_size)
+
+def format_profile(profile):
+    # same layout as profile.json: one line per (club, lie)
+    lines = ["{"]
+    for club_index, (club, lies) in enumerate(profile.items()):
+        lines.append(f'    "{club}": {{')
+        for lie_index, (lie, params) in enumerate(lies.items()):
+            values = ", ".join(f'"{key}": {value}' for key, value in params.items())
+            lines.append(f'        "{lie}": {{{values}}}' + ("," if lie_index < len(lies) - 1 else ""))
+        lines.append("    }" + ("," if club_index < len(profile) - 1 else ""))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class ShotStatistics:
+    def __init__(self, clubs):
+        self.clubs = list(clubs)
+        self.sums = np.zeros((len(self.clubs), len(LIES), NUM_SUMS))
+
+    def update(self, clubs, lies, ball, aim, landing):
+        # add a chunk of shots. shots with unknown clubs or lies (index -1) are skipped
+        valid = (clubs >= 0) & (lies >= 0) & (lies < len(LIES))
+        clubs, lies, aim = clubs[valid], lies[valid], aim[valid]
+        displacement = landing[valid] - ball[valid]
+
+        # distance along the aim, and the displacement rotated back by the aim: p = d q + (h z0, v z1)
+        cos, sin = np.cos(aim), np.sin(aim)
+        along = displacement[:, 0] * cos + displacement[:, 1] * sin
+        p0 = displacement[:, 0] * cos - displacement[:, 1] * sin
+        p1 = displacement[:, 0] * sin + displacement[:, 1] * cos
+        q0, q1 = np.cos(2 * aim), np.sin(2 * aim)
+
+        terms = np.stack([np.ones_like(along), along, p0 * p0, p0 * q0, q0 * q0, p1 * p1, p1 * q1, q1 * q1,
+                          p0 * p1, p0 * q1 + p1 * q0, q0 * q1], axis=1)
+        keys = clubs * len(LIES) + lies
+        size = len(self.clubs) * len(LIES)
+        for index in range(NUM_SUMS):
+            self.sums[..., index] += np.bincount(keys, weights=terms[:, index], minlength=size).reshape(len(self.clubs), len(LIES))
+
+    def estimates(self):
+        # per (club, lie): shot counts, mean distance, horizontal and vertical standard deviations and the
+        # correlation of the two noise components (0 under the profile's model)
+        count = self.sums[..., 0]
+        n = np.maximum(count, 1)
+        means = self.sums[..., 1:] / n[..., None]
+        distance = means[..., 0]
+        # the variances of w = p - d q, corrected for the estimated distance
+        correction = n / np.maximum(n - 1, 1)
+        horizontal = (means[..., 1] - 2 * distance * means[..., 2] + distance**2 * means[..., 3]) * correction
+        vertical = (means[..., 4] - 2 * distance * means[..., 5] + distance**2 * means[..., 6]) * correction
+        covariance = (means[..., 7] - distance * means[..., 8] + distance**2 * means[..., 9]) * correction
+        horizontal_std = np.sqrt(np.maximum(horizontal, 0))
+        vertical_std = np.sqrt(np.maximum(vertical, 0))
+        correlation = np.divide(covariance, horizontal_std * vertical_std, out=np.zeros_like(covariance),
+                                where=horizontal_std * vertical_std > 0)
+        return count, distance, horizontal_std, vertical_std, correlation
+
+    def calibrated_profile(self, profile, min_shots=100):
+        # copy of the profile in which every (club, lie) with at least min_shots shots is replaced by its estimates
+        count, distance, horizontal_std, vertical_std, _ = self.estimates()
+        calibrated = {club: {lie: dict(params) for lie, params in lies.items()} for club, lies in profile.items()}
+        for club_index, club in enumerate(self.clubs):
+            for lie_index, lie in enumerate(LIES):
+                if count[club_index, lie_index] >= min_shots:
+                    calibrated[club][lie] = {
+                        "distance": round(float(distance[club_index, lie_index]), 1),
+                        "horizontal_std": round(float(horizontal_std[club_index, lie_index]), 1),
+                        "vertical_std": round(float(vertical_std[club_index, lie_index]), 1),
+                    }
+        return calibrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit a player profile to shot logs.")
+    parser.add_argument("logs", nargs="+", help="rollout recording directories or CSV shot logs")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="profile to start from (clubs and uncalibrated entries)")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--min-shots", type=int, default=100, help="shots needed to replace a (club, lie) entry")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows per chunk of CSV logs")
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+    statistics = ShotStatistics(profile.keys())
+    num_shots = 0
+    for path in args.logs:
+        for chunk in iter_shot_chunks(path, statistics.clubs, args.chunk_size):
+            statistics.update(*chunk)
+            num_shots += len(chunk[0])
+        print(f"{path}: {num_shots:,} shots so far")
+
+    count, distance, horizontal_std, vertical_std, correlation = statistics.estimates()
+    print(f"{'club':<16} {'lie':<8} {'shots':>9} {'distance':>9} {'h std':>7} {'v std':>7} {'corr':>6}")
+    for club_index, club in enumerate(statistics.clubs):
+        for lie_index, lie in enumerate(LIES):
+            if count[club_index, lie_index] >= args.min_shots:
+                print(f"{club:<16} {lie:<8} {int(count[club_index, lie_index]):9d} {distance[club_index, lie_index]:9.1f} "
+                      f"{horizontal_std[club_index, lie_index]:7.1f} {vertical_std[club_index, lie_index]:7.1f} "
+                      f"{correlation[club_index, lie_index]:6.2f}")
+
+    with open(args.output, "w") as file:
+        file.write(format_profile(statistics.calibrated_profile(profile, args.min_shots)))
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
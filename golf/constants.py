@@ -1,3 +1,5 @@
+import os
+
 # color constants
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -31,3 +33,28 @@ WIDTH = 80
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 500
 BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 50
+
+# terrain classes, used as values of the per-pixel terrain grid of a course
+OUT_OF_BOUNDS = 0
+TEEBOX = 1
+FAIRWAY = 2
+ROUGH = 3
+BUNKER = 4
+GREEN = 5
+WATER_HAZARD = 6
+HOLE = 7
+FLAG = 8
+
+# name and color of each terrain class (the hole and the flag count as part of the green)
+TERRAIN_NAMES = ("Out of Bounds", "Teebox", "Fairway", "Rough", "Bunker", "Green", "Water Hazard", "Green", "Green")
+TERRAIN_COLORS = (BLACK, GREEN_TEEBOX, GREEN_FAIRWAY, GREEN_ROUGH, YELLOW, GREEN_GREEN, BLUE, BLACK, RED)
+# terrain class of each element name, used to store lies compactly
+TERRAIN_IDS = {name: TERRAIN_NAMES.index(name) for name in TERRAIN_NAMES}
+
+# lies the ball can be hit from, in the order of the one hot lie encoding
+LIES = ("Teebox", "Fairway", "Rough", "Bunker")
+# index in LIES of each terrain class, -1 for the classes the ball is never played from
+TERRAIN_LIES = tuple(LIES.index(name) if name in LIES else -1 for name in TERRAIN_NAMES)
+
+# player profile shipped with the simulator
+DEFAULT_PROFILE = os.path.join(os.path.dirname(__file__), "profile.json")
@@ -4,54 +4,50 @@
 # Date: 06/04/2023
 # Description: This file contains the CourseElement, Teebox, and GolfCourse classes. The CourseElement class is an abstract class that represents a course element. 
 # The Teebox class is a subclass of CourseElement that represents a teebox. The GolfCourse class represents a golf course and contains methods 
+# Courses are rasterized into a per-pixel terrain grid with NumPy only, pygame is imported lazily the first time a course is drawn.
 # -------------------------------------------------------------------------------------
 
 # import packagees
-import pygame
 import numpy as np
-from utils import generate_bezier_path, generate_height_envelope
+from .utils import Rect, generate_bezier_path, generate_height_envelope, rotated_size, fill_rotated_shape, fill_rotated_rects, fill_triangle
 import random
-from constants import *
+from .constants import *
+from .roll import RollFields
 
 # ---------------
 # Class Definitions
 # ---------------
 
 class CourseElement:
-    def __init__(self, rect, color):
+    def __init__(self, rect, terrain):
         self.rect = rect
-        self.color = color
+        self.terrain = terrain
 
-    def draw(self, screen):
+    def rasterize(self, terrain):
         # override this method in subclasses
         pass
 
 class Teebox(CourseElement):
     def __init__(self, rect, angle):
-        super().__init__(rect=rect, color=GREEN_TEEBOX)
+        super().__init__(rect=rect, terrain=TEEBOX)
         self.angle = angle
 
-        # precompute the rotated rectangle for the teebox
-        teebox_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        teebox_surface.fill(self.color)
-        self.rotated_teebox = pygame.transform.rotate(teebox_surface, -self.angle)
-        self.rotated_rect = self.rotated_teebox.get_rect(center=self.rect.center)
-
-    def draw(self, screen):
-        screen.blit(self.rotated_teebox, self.rotated_rect.topleft)
+    def rasterize(self, terrain):
+        # the teebox is a rectangle rotated around its center
+        fill_rotated_shape(terrain, self.terrain, self.rect.center, self.rect.width, self.rect.height, self.angle)
 
 
 class Green(CourseElement):
-    def __init__(self, rect, angle):
-        super().__init__(rect, GREEN_GREEN)
+    def __init__(self, rect, angle, rng=random):
+        super().__init__(rect, GREEN)
         self.angle = angle
 
         # randomly generate the position of the hole. The hole must be within the rotated ellipse bounded by the rotated rectangle.
         # this calculation is slighlty involved, but we we'll do it via rejection sampling via the mathematical definition of an ellipse
  
         while True:
-            hole_x = random.randint(rect.left + HOLE_MARGIN, rect.right - HOLE_MARGIN)
-            hole_y = random.randint(rect.top + HOLE_MARGIN, rect.bottom - HOLE_MARGIN)
+            hole_x = rng.randint(rect.left + HOLE_MARGIN, rect.right - HOLE_MARGIN)
+            hole_y = rng.randint(rect.top + HOLE_MARGIN, rect.bottom - HOLE_MARGIN)
 
             # check if these coordinates are within the ROTATED ellipse
             x = hole_x - rect.centerx
@@ -65,44 +61,37 @@ class Green(CourseElement):
 
         self.hole_position = (hole_x, hole_y)
 
-    def draw(self, screen):
-        # draw a rotated ellipse bounded by the rectangle
-        green_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        pygame.draw.ellipse(green_surface, self.color, green_surface.get_rect())
-        
-        # rotate the ellipse
-        rotated_green = pygame.transform.rotate(green_surface, -self.angle)
-        screen.blit(rotated_green, self.rect.topleft)
+    def rasterize(self, terrain):
+        # the green is an ellipse bounded by the rotated rectangle. the rotated bounding box is anchored at the
+        # top left corner of the unrotated rectangle, so the ellipse center is shifted accordingly
+        rotated_width, rotated_height = rotated_size(self.rect.width, self.rect.height, self.angle)
+        center = (self.rect.left + rotated_width / 2, self.rect.top + rotated_height / 2)
+        fill_rotated_shape(terrain, self.terrain, center, self.rect.width, self.rect.height, self.angle, ellipse=True)
 
         # draw the hole
-        self.draw_hole(screen)
+        self.rasterize_hole(terrain)
 
-    def draw_hole(self, screen):
+    def rasterize_hole(self, terrain):
         hole_x, hole_y = self.hole_position
-        pygame.draw.circle(screen, BLACK, (hole_x, hole_y), HOLE_RADIUS)
-        flag_pole_top = (hole_x, hole_y - FLAG_HEIGHT)
-        pygame.draw.line(screen, BLACK, (hole_x, hole_y), flag_pole_top, 2)
+        fill_rotated_shape(terrain, HOLE, (hole_x, hole_y), 2 * HOLE_RADIUS + 1, 2 * HOLE_RADIUS + 1, 0, ellipse=True)
+        terrain[max(hole_x - 1, 0):hole_x + 1, max(hole_y - FLAG_HEIGHT, 0):hole_y + 1] = HOLE
         flag_points = [(hole_x, hole_y - FLAG_HEIGHT), (hole_x + FLAG_WIDTH, hole_y - FLAG_HEIGHT + FLAG_WIDTH // 2), (hole_x, hole_y - FLAG_HEIGHT + FLAG_WIDTH)]
-        pygame.draw.polygon(screen, RED, flag_points)
+        fill_triangle(terrain, FLAG, *flag_points)
 
 class Hazard(CourseElement):
-    def __init__(self, rect, color, angle):
-        super().__init__(rect, color)
+    def __init__(self, rect, terrain, angle):
+        super().__init__(rect, terrain)
         self.angle = angle
 
-    def draw(self, screen):
-        # draw a rotated rectangle for the hazard
-        hazard_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        pygame.draw.ellipse(hazard_surface, self.color, hazard_surface.get_rect())
-        rotated_hazard = pygame.transform.rotate(hazard_surface, -self.angle)
-
-        rotated_rect = rotated_hazard.get_rect(center=self.rect.center)
-        screen.blit(rotated_hazard, rotated_rect.topleft)
+    def rasterize(self, terrain):
+        # the hazard is an ellipse bounded by the rectangle, rotated around its center
+        fill_rotated_shape(terrain, self.terrain, self.rect.center, self.rect.width, self.rect.height, self.angle, ellipse=True)
 
 
 class FairwayAndRough(CourseElement):
-    def __init__(self, rect):
-        super().__init__(rect=rect, color=GREEN_FAIRWAY)
+    def __init__(self, rect, rng=random):
+        super().__init__(rect=rect, terrain=FAIRWAY)
+        self.rng = rng
 
         # generate random points for the bezier curve
         points = self.generate_path(rect)
@@ -117,7 +106,7 @@ class FairwayAndRough(CourseElement):
         points = []
         for i in range(num_points):
             x = rect.midleft[0] + (i) * (rect.width / (num_points - 1))
-            y = random.randint(rect.top + COURSE_VERTICAL_MARGIN, rect.bottom - COURSE_VERTICAL_MARGIN)
+            y = self.rng.randint(rect.top + COURSE_VERTICAL_MARGIN, rect.bottom - COURSE_VERTICAL_MARGIN)
             points.append([x, y])
         return np.array(points)
 
@@ -150,93 +139,91 @@ class FairwayAndRough(CourseElement):
             envelope_deltas.append(delta_y)
         return envelope_deltas  
 
-    def draw_fairway(self, screen):
-        # create a surface for the fairway 
-        fairway_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_WIDTH), pygame.SRCALPHA)
-
-        # draw overlapping rectangles for the fairway and rough
-        for i in range(len(self.fairway_path) - 1):
-            p0 = self.fairway_path[i] 
-            p1 = self.fairway_path[i + 1] 
-            angle = np.degrees(np.arctan2(p1[1] - p0[1], p1[0] - p0[0]))
-            delta_y = self.fairway_envelope[i]
+    def rasterize_fairway(self, terrain):
+        # draw overlapping rectangles along the path, each one centered on a path point and aligned with the path
+        path = self.fairway_path
+        angles = np.degrees(np.arctan2(path[1:, 1] - path[:-1, 1], path[1:, 0] - path[:-1, 0]))
 
-            # calculate the width of the rectangle
-            width = 10
-            fairway_height = 2 * delta_y
+        # calculate the width and height of the rectangles
+        width = 10
+        fairway_heights = 2 * np.array(self.fairway_envelope[:-1])
 
-            # create a temporary surface for the rectangle
-            temp_surface_fairway = pygame.Surface((width, fairway_height), pygame.SRCALPHA)
-            temp_surface_fairway.fill(GREEN_FAIRWAY)
+        fill_rotated_rects(terrain, FAIRWAY, path[:-1], np.full(len(angles), width), fairway_heights, angles)
 
-            # rotate the temporary surface
-            rotated_surface_fairway = pygame.transform.rotate(temp_surface_fairway, -angle)
+    def rasterize_rough(self, terrain):
+        # draw overlapping rectangles for the rough
+        path = self.rough_path
+        angles = np.degrees(np.arctan2(path[1:, 1] - path[:-1, 1], path[1:, 0] - path[:-1, 0]))
 
-            # get the new rect of the rotated surface
-            rotated_rect_fairway = rotated_surface_fairway.get_rect(center=(p0[0], p0[1]))
+        # calculate the width and height of the rectangles
+        width = 10
+        rough_heights = 2 * np.array(self.rough_envelope[:-1]) * ROUGH_HEIGHT_MULTIPLIER
 
-            # blit the rotated surface onto the fairway surface
-            fairway_surface.blit(rotated_surface_fairway, rotated_rect_fairway.topleft)
-      
-        # blit the surfaces to the screen
-        screen.blit(fairway_surface, (0,0))
+        fill_rotated_rects(terrain, ROUGH, path[:-1], np.full(len(angles), width), rough_heights, angles)
 
-    def draw_rough(self, screen):
-        # create a surface for the rough
-        rough_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_WIDTH), pygame.SRCALPHA)
-
-        # draw overlapping rectangles for the fairway and rough
-        for i in range(len(self.rough_path) - 1):
-            p0 = self.rough_path[i] 
-            p1 = self.rough_path[i + 1] 
-            angle = np.degrees(np.arctan2(p1[1] - p0[1], p1[0] - p0[0]))
-            delta_y = self.rough_envelope[i]
-
-            # calculate the width of the rectangle
-            width = 10
-            rough_height = 2 * delta_y * ROUGH_HEIGHT_MULTIPLIER
-
-            # create a temporary surface for the rectangle
-            temp_surface_rough = pygame.Surface((width, rough_height), pygame.SRCALPHA)
-            temp_surface_rough.fill(GREEN_ROUGH)
-
-            # rotate the temporary surface
-            rotated_surface_rough = pygame.transform.rotate(temp_surface_rough, -angle)
-
-            # get the new rect of the rotated surface
-            rotated_rect_rough = rotated_surface_rough.get_rect(center=(p0[0], p0[1]))
-
-            # blit the rotated surface onto the fairway surface
-            rough_surface.blit(rotated_surface_rough, rotated_rect_rough.topleft)
-      
-        # blit the surfaces to the screen
-        screen.blit(rough_surface, (0,0))
-
-    def draw(self, screen):
-        self.draw_rough(screen)
-        self.draw_fairway(screen)
+    def rasterize(self, terrain):
+        self.rasterize_rough(terrain)
+        self.rasterize_fairway(terrain)
 
 class GolfCourse:
-    def __init__(self, par, difficulty):
+    def __init__(self, par, difficulty, seed=None):
         self.par = par
         self.difficulty = difficulty
-        self.fairway_and_rough = FairwayAndRough(pygame.Rect(100, 100, SCREEN_WIDTH-200, SCREEN_HEIGHT-200))
+        # every random choice goes through this generator, so the same seed always produces the same course
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.fairway_and_rough = FairwayAndRough(Rect(100, 100, SCREEN_WIDTH-200, SCREEN_HEIGHT-200), rng=self.rng)
         
         self.initialize_teebox()
         self.initialize_green()
         self.initialize_hazards()
 
-        # draw the elements to the course surface
-        self.course_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        self.fairway_and_rough.draw(self.course_surface)
-        self.teebox.draw(self.course_surface)
-        self.green.draw(self.course_surface)
+        # rasterize the elements into the terrain grid, indexed [x, y] like pygame.surfarray arrays
+        self.terrain = np.zeros((SCREEN_WIDTH, SCREEN_HEIGHT), dtype=np.uint8)
+        self.fairway_and_rough.rasterize(self.terrain)
+        self.teebox.rasterize(self.terrain)
+        self.green.rasterize(self.terrain)
         
         # draw the hazards
         for bunker in self.bunkers:
-            bunker.draw(self.course_surface)
+            bunker.rasterize(self.terrain)
         for water_hazard in self.water_hazards:
-            water_hazard.draw(self.course_surface)
+            water_hazard.rasterize(self.terrain)
+
+        self._image = None
+        self._course_surface = None
+        self._roll_fields = None
+
+    @property
+    def start_position(self):
+        # the ball is teed up in the middle of the teebox
+        return self.teebox.rect.center
+
+    @property
+    def image(self):
+        # RGB image of the course, laid out like pygame.surfarray.array3d(course_surface). it is shared by everything
+        # drawing the course, so it is read-only
+        if self._image is None:
+            self._image = np.array(TERRAIN_COLORS, dtype=np.uint8)[self.terrain]
+            self._image.setflags(write=False)
+        return self._image
+
+    @property
+    def course_surface(self):
+        # the pygame surface is only built when the course is drawn for the first time
+        if self._course_surface is None:
+            import pygame
+            self._course_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            pygame.surfarray.blit_array(self._course_surface, self.image)
+            pygame.surfarray.pixels_alpha(self._course_surface)[:] = np.where(self.terrain == OUT_OF_BOUNDS, 0, 255)
+        return self._course_surface
+
+    @property
+    def roll_fields(self):
+        # slope fields of the roll model (see roll.py), only built when a ball rolls on the course for the first time
+        if self._roll_fields is None:
+            self._roll_fields = RollFields(self, seed=self.seed)
+        return self._roll_fields
 
     def initialize_teebox(self):
         # calculate the position and angle of the teebox
@@ -245,7 +232,7 @@ class GolfCourse:
         teebox_y = self.fairway_and_rough.fairway_path[0][1] + TEEBOX_MARGIN * np.sin(np.radians(teebox_angle))
 
         # create the teebox
-        self.teebox = Teebox(pygame.Rect(teebox_x, teebox_y - TEEBOX_HEIGHT / 2, TEEBOX_WIDTH, TEEBOX_HEIGHT), teebox_angle)
+        self.teebox = Teebox(Rect(teebox_x, teebox_y - TEEBOX_HEIGHT / 2, TEEBOX_WIDTH, TEEBOX_HEIGHT), teebox_angle)
 
     def initialize_green(self):
         # calculate the position of the green
@@ -254,11 +241,11 @@ class GolfCourse:
         green_y = self.fairway_and_rough.fairway_path[-1][1] - GREEN_MARGIN * np.sin(np.radians(green_angle))
 
         # generate random dimensions for the green
-        green_width = GREEN_WIDTH + random.randint(-10, 50)
-        green_height = GREEN_HEIGHT + random.randint(-10, 50)
+        green_width = GREEN_WIDTH + self.rng.randint(-10, 50)
+        green_height = GREEN_HEIGHT + self.rng.randint(-10, 50)
 
         # create the green
-        self.green = Green(pygame.Rect(green_x - green_width / 2, green_y - green_height / 2, green_width, green_height), green_angle)
+        self.green = Green(Rect(green_x - green_width / 2, green_y - green_height / 2, green_width, green_height), green_angle, rng=self.rng)
 
     def initialize_hazards(self):
         # sample the number of each type of hazard
@@ -273,10 +260,10 @@ class GolfCourse:
         def get_random_point_along_fairway(max_offset=55, min_offset=20):
             start_index = len(self.fairway_and_rough.fairway_path) // 4
             end_index = int(2.75 * len(self.fairway_and_rough.fairway_path) // 4)
-            index = random.randint(start_index, end_index)
+            index = self.rng.randint(start_index, end_index)
             point = self.fairway_and_rough.fairway_path[index]
-            offset = random.uniform(min_offset, max_offset)
-            offset *= random.choice([-1, 1])
+            offset = self.rng.uniform(min_offset, max_offset)
+            offset *= self.rng.choice([-1, 1])
             return [point[0] + offset, point[1] + offset]
 
         # helper function to check if a hazard is in a valid position
@@ -291,26 +278,26 @@ class GolfCourse:
 
         for _ in range(num_bunkers):
             while True:
-                bunker_width = random.randint(20, 90)
-                bunker_height = random.randint(20, 55)
+                bunker_width = self.rng.randint(20, 90)
+                bunker_height = self.rng.randint(20, 55)
                 bunker_position = get_random_point_along_fairway()
-                bunker_angle = random.randint(0, 360)
+                bunker_angle = self.rng.randint(0, 360)
 
-                bunker_rect = pygame.Rect(bunker_position[0] - bunker_width / 2, bunker_position[1] - bunker_height / 2, bunker_width, bunker_height)
+                bunker_rect = Rect(bunker_position[0] - bunker_width / 2, bunker_position[1] - bunker_height / 2, bunker_width, bunker_height)
                 if is_valid_hazard_position(bunker_rect):
-                    self.bunkers.append(Hazard(bunker_rect, YELLOW, bunker_angle))
+                    self.bunkers.append(Hazard(bunker_rect, BUNKER, bunker_angle))
                     break
 
         for _ in range(num_water_hazards):
             while True:
-                water_width = random.randint(60, 120)
-                water_height = random.randint(50, 100)
+                water_width = self.rng.randint(60, 120)
+                water_height = self.rng.randint(50, 100)
                 water_position = get_random_point_along_fairway()
-                water_angle = random.randint(0, 360)
+                water_angle = self.rng.randint(0, 360)
 
-                water_rect = pygame.Rect(water_position[0] - water_width / 2, water_position[1] - water_height / 2, water_width, water_height)
+                water_rect = Rect(water_position[0] - water_width / 2, water_position[1] - water_height / 2, water_width, water_height)
                 if is_valid_hazard_position(water_rect):
-                    self.water_hazards.append(Hazard(water_rect, BLUE, water_angle))
+                    self.water_hazards.append(Hazard(water_rect, WATER_HAZARD, water_angle))
                     break
     
     def draw(self, screen):
@@ -322,20 +309,14 @@ class GolfCourse:
         if pos[0] < 0 or pos[0] >= SCREEN_WIDTH or pos[1] < 0 or pos[1] >= SCREEN_HEIGHT:
             return "Out of Bounds"
 
-        # check the color of the pixel at the position to determine the element
-        color = self.course_surface.get_at(pos)
-        
-        if color == GREEN_FAIRWAY:
-            return "Fairway"
-        elif color == GREEN_ROUGH:
-            return "Rough"
-        elif color == GREEN_TEEBOX:
-            return "Teebox"
-        elif color == GREEN_GREEN or color == RED or color == BLACK:
-            return "Green"
-        elif color == YELLOW:
-            return "Bunker"
-        elif color == BLUE:
-            return "Water Hazard"
-        else:
-            return "Out of Bounds"
\ No newline at end of file
+        # look up the terrain class of the pixel at the position to determine the element
+        return TERRAIN_NAMES[self.terrain[int(pos[0]), int(pos[1])]]
+
+    def get_terrain_at(self, positions):
+        # vectorized lookup of the terrain class at an array of (x, y) positions, truncated to pixels like get_element_at
+        positions = np.asarray(positions)
+        x = positions[..., 0].astype(int)
+        y = positions[..., 1].astype(int)
+        inside = (x >= 0) & (x < SCREEN_WIDTH) & (y >= 0) & (y < SCREEN_HEIGHT)
+        terrain = self.terrain[np.where(inside, x, 0), np.where(inside, y, 0)]
+        return np.where(inside, terrain, OUT_OF_BOUNDS)
@@ -0,0 +1,142 @@
+# ------------------------------------------------------------------------------------
+# File: course_library.py
+# Description: This file contains the CourseLibrary class. Courses are identified by the seed they are generated
+# from, so recorded data only needs to keep a course id and any course can be rebuilt from it. Recently used
+# courses are kept in a small LRU cache.
+#
+# It also contains the CoursePrefetcher, which generates random playable courses in a background process and keeps
+# a bounded queue of them ready, so that resets do not wait for course generation. Where no worker can be started
+# (e.g. inside the daemonic workers of SubprocVecEnv), courses are generated synchronously instead.
+# -------------------------------------------------------------------------------------
+
+# import packages
+import collections
+import multiprocessing
+import queue
+import warnings
+import numpy as np
+from .course import GolfCourse
+
+# course ids are drawn below this bound so they stay exact when a policy casts observations to float32
+MAX_COURSE_ID = 2**24
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def is_playable(course):
+    # a course can be played when the ball starts on the teebox
+    return course.get_element_at(course.start_position) == "Teebox"
+
+def prefetch_courses(par, difficulty, seed, courses):
+    # generate random playable courses forever. put blocks while the queue is full, so at most its size is ready
+    rng = np.random.default_rng(seed)
+    while True:
+        course_id = int(rng.integers(MAX_COURSE_ID))
+        course = GolfCourse(par=par, difficulty=difficulty, seed=course_id)
+        if is_playable(course):
+            courses.put((course_id, course))
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class CourseLibrary:
+    def __init__(self, par=4, difficulty=2, cache_size=32):
+        self.par = par
+        self.difficulty = difficulty
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+
+    def get(self, course_id):
+        # return the course with the given id, regenerating it if it is not cached
+        course = self.cache.get(course_id)
+        if course is None:
+            course = GolfCourse(par=self.par, difficulty=self.difficulty, seed=course_id)
+            self.add(course_id, course)
+        else:
+            self.cache.move_to_end(course_id)
+        return course
+
+    def add(self, course_id, course):
+        self.cache[course_id] = course
+        self.cache.move_to_end(course_id)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def sample_id(self, rng):
+        # draw random course ids until one of them is playable, only playable courses are cached
+        while True:
+            course_id = int(rng.integers(MAX_COURSE_ID))
+            if course_id in self.cache:
+                return course_id
+            course = GolfCourse(par=self.par, difficulty=self.difficulty, seed=course_id)
+            if is_playable(course):
+                self.add(course_id, course)
+                return course_id
+
+
+class CoursePrefetcher:
+    def __init__(self, library, queue_size=8, seed=None):
+        # courses are added to the library when they are handed out, so they are cached like any other course
+        self.library = library
+        self.hits = 0
+        self.misses = 0
+        self.warned = False
+        # the worker is spawned from a clean interpreter, generating courses only needs NumPy
+        context = multiprocessing.get_context("spawn")
+        self.courses = context.Queue(maxsize=queue_size)
+        self.process = context.Process(target=prefetch_courses, args=(library.par, library.difficulty, seed, self.courses),
+                                       daemon=True)
+        try:
+            # daemonic processes (e.g. the workers of SubprocVecEnv) cannot have children
+            if multiprocessing.current_process().daemon:
+                raise RuntimeError("daemonic processes are not allowed to have children")
+            self.process.start()
+        except (AssertionError, OSError, RuntimeError) as error:
+            # every course is then generated synchronously, and counted as a miss
+            warnings.warn(f"course prefetch worker could not start ({error}), courses are generated synchronously",
+                          RuntimeWarning)
+            self.warned = True
+            self.courses.close()
+            self.process = None
+
+    def next_id(self, rng):
+        # id of a playable course, taken from the queue if one is ready, otherwise generated here with rng
+        if self.process is None:
+            self.misses += 1
+            return self.library.sample_id(rng)
+        try:
+            course_id, course = self.courses.get_nowait()
+        except queue.Empty:
+            self.misses += 1
+            if not self.warned and not self.process.is_alive():
+                # e.g. a spawned worker which failed to start, every reset now generates its course here
+                warnings.warn(f"course prefetch worker exited with code {self.process.exitcode}, "
+                              "courses are generated synchronously", RuntimeWarning)
+                self.warned = True
+            return self.library.sample_id(rng)
+        self.hits += 1
+        self.library.add(course_id, course)
+        return course_id
+
+    @property
+    def hit_rate(self):
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def stats(self):
+        if self.process is None:
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "ready": 0}
+        try:
+            ready = self.courses.qsize()
+        except NotImplementedError:
+            # not available on macOS
+            ready = None
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "ready": ready}
+
+    def close(self):
+        if self.process is None:
+            return
+        self.process.terminate()
+        self.process.join()
+        self.courses.close()
@@ -1,28 +1,35 @@
+import math
+import random
 import pygame
-from course import GolfCourse
-from ball import Ball
+from .course import GolfCourse
+from .course_library import MAX_COURSE_ID
+from .ball import Ball
 import json
-from ui import draw_ui, draw_out_of_bounds, draw_hole_complete
-from aiming import AimingSystem
-from constants import *
+from .ui import draw_ui, draw_out_of_bounds, draw_hole_complete, draw_caddie
+from .aiming import AimingSystem
+from .constants import *
 
 
 class Game:
-    def __init__(self, screen, profile_file):
+    def __init__(self, screen, profile_file=DEFAULT_PROFILE, course=None, caddie=None):
         # set UI params
         self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 22)
         self.button_rect = pygame.Rect((SCREEN_WIDTH - BUTTON_WIDTH) // 2, SCREEN_HEIGHT - BUTTON_HEIGHT - 20, BUTTON_WIDTH, BUTTON_HEIGHT)
         # set game params   
         self.screen = screen
         self.load_profile(profile_file)
+        # optional shot recommendations, computed in a background process (see caddie.py)
+        self.caddie = caddie
         # initialize game objects
-        self.reset_game()
+        self.reset_game(course)
 
-    def reset_game(self):
-        # generate a new random course
-        self.course = GolfCourse(par=4, difficulty=2)
+    def reset_game(self, course=None):
+        # generate a new random course, unless one is given (e.g. the course of a headless simulation). the seed lets
+        # the caddie rebuild the course in its own process
+        self.course = course if course is not None else GolfCourse(par=4, difficulty=2, seed=random.randrange(MAX_COURSE_ID))
         # place the ball at the teebox
-        start_pos = self.course.teebox.rotated_rect.center
+        start_pos = self.course.start_position
         self.ball = Ball(start_pos[0], start_pos[1], 3, WHITE)
         # initialize the aiming system according to the player's profile
         self.aiming_system = AimingSystem(params=self.profile)
@@ -48,6 +55,13 @@ class Game:
             draw_hole_complete(self.screen, self.font)
 
         else:
+            # draw the caddie's advice for the current position and aim
+            if self.caddie is not None and self.ball.next_pos is None and self.current_lie in LIES:
+                ball_pos = self.ball.get_pos()
+                aim_angle = math.atan2(mouse_pos[1] - ball_pos[1], mouse_pos[0] - ball_pos[0])
+                self.caddie.update(self.course, ball_pos, self.current_lie, self.aiming_system.current_club, aim_angle)
+                draw_caddie(self.screen, self.small_font, self.caddie.poll(), self.caddie.objective, ball_pos)
+
             # draw the aiming system
             if self.ball.next_pos is None:
                 self.aiming_system.draw_arrow(self.screen, self.ball.get_pos(), mouse_pos)
@@ -109,6 +123,9 @@ class Game:
             elif event.key == pygame.K_RIGHT:
                 self.current_club_index = (self.current_club_index + 1) % len(self.clubs)
                 self.aiming_system.change_club(self.clubs[self.current_club_index])
+            # switch the caddie between ranking by expected strokes and by penalty risk
+            elif event.key == pygame.K_TAB and self.caddie is not None:
+                self.caddie.toggle_objective()
 
     def handle_out_of_bounds(self, target_pos, next_lie):
         # save the previous position
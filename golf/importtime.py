@@ -0,0 +1,65 @@
+# ------------------------------------------------------------------------------------
+# File: importtime.py
+# Description: This file measures how long a fresh interpreter takes to import the slim simulation entry point
+# (golf.sim) and checks it against an import-time budget. It also makes sure that none of the rendering
+# dependencies are loaded on the way, so simulation workers stay cheap to spawn.
+#
+# Usage:
+#   python -m golf.importtime --budget-ms 250 --repeat 5
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# modules which must only be loaded once something is rendered
+RENDERING_MODULES = ("pygame", "scipy", "matplotlib", "golf.game", "golf.ui", "golf.ball")
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def measure(module, repeat=5):
+    # import the module in fresh interpreters and return the import times (seconds) and the rendering modules it loaded
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {RENDERING_MODULES!r} if m in sys.modules]]))\n"
+    )
+    times = []
+    loaded = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        elapsed, modules = json.loads(output.strip().splitlines()[-1])
+        times.append(elapsed)
+        loaded.update(modules)
+    return times, sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the slim simulation entry point.")
+    parser.add_argument("--module", default="golf.sim")
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # numpy is the only dependency, so its own import time is the floor
+    numpy_times, _ = measure("numpy", args.repeat)
+    times, loaded = measure(args.module, args.repeat)
+    median = statistics.median(times) * 1000
+
+    print(f"numpy:        {statistics.median(numpy_times) * 1000:.1f} ms")
+    print(f"{args.module}: {median:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if loaded:
+        print(f"rendering modules loaded: {', '.join(loaded)}")
+
+    if median > args.budget_ms or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pygame
-from game import Game
-from constants import WHITE, SCREEN_WIDTH, SCREEN_HEIGHT, BUTTON_WIDTH, BUTTON_HEIGHT
+from .caddie import Caddie
+from .game import Game
+from .constants import WHITE, SCREEN_WIDTH, SCREEN_HEIGHT, BUTTON_WIDTH, BUTTON_HEIGHT, DEFAULT_PROFILE
 
 
 def main():
@@ -9,7 +10,9 @@ def main():
     pygame.display.set_caption("Random Golf Course Generator")
     clock = pygame.time.Clock()
 
-    game = Game(screen, "golf/profile.json")
+    # the caddie searches for shots in a background process while the game runs
+    caddie = Caddie(DEFAULT_PROFILE)
+    game = Game(screen, DEFAULT_PROFILE, caddie=caddie)
 
     running = True
     while running:
@@ -25,6 +28,7 @@ def main():
         pygame.display.flip()
         clock.tick(120)
 
+    caddie.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+# ------------------------------------------------------------------------------------
+# File: planner.py
+# Description: This file contains the Planner class, a non-learned golf agent which searches over (club, aim angle)
+# actions from the current ball position. Every candidate action is a chance node: its outcome is estimated from
+# batches of sampled landings, each followed by a vectorized greedy rollout to the hole (see batch_sim.py). Actions
+# are raced against each other within a fixed time budget per shot: after every round of samples, the actions which
+# are clearly worse than the best one are dropped, so the remaining budget goes to the close calls. Rounds can be
+# spread over worker processes.
+#
+# Usage:
+#   python -m golf.planner --holes 10 --time-budget 0.5 --workers 4 --record rollouts/planner
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .batch_sim import BatchSim
+from .constants import DEFAULT_PROFILE, LIES, TERRAIN_IDS
+from .course_library import CourseLibrary
+from .sim import GolfSim, load_profile
+
+# state of a worker process, created once by init_worker
+_worker = None
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def init_worker(profile_file, par, difficulty, horizon):
+    global _worker
+    _worker = (BatchSim(load_profile(profile_file), horizon=horizon), CourseLibrary(par=par, difficulty=difficulty, cache_size=4))
+
+def simulate_actions(batch_sim, course, ball_pos, lie, actions, batch_size, rng):
+    # play batch_size simulations of every (club, angle) action and return the sum and the sum of squares of the
+    # strokes to hole out, and the number of penalty shots, per action
+    num_actions = len(actions)
+    clubs = np.repeat(actions[:, 0].astype(int), batch_size)
+    angles = np.repeat(actions[:, 1], batch_size)
+    positions = np.broadcast_to(np.asarray(ball_pos, dtype=float), (len(clubs), 2))
+    lies = np.full(len(clubs), lie)
+
+    # the first shot is the chance node of the action, the rest of the hole is played by the rollout policy
+    _, terrain, strokes, holed, next_positions, next_lies = batch_sim.play_shots(
+        course, positions, lies, clubs, angles, rng.standard_normal((len(clubs), 2)))
+    strokes = strokes.astype(float)
+    playing = ~holed
+    strokes[playing] += batch_sim.rollout(course, next_positions[playing], next_lies[playing], rng)
+
+    strokes = strokes.reshape(num_actions, batch_size)
+    penalties = (terrain.reshape(num_actions, batch_size) == TERRAIN_IDS["Out of Bounds"]) | \
+                (terrain.reshape(num_actions, batch_size) == TERRAIN_IDS["Water Hazard"])
+    return strokes.sum(axis=1), (strokes**2).sum(axis=1), penalties.sum(axis=1)
+
+def simulate_in_worker(course_id, ball_pos, lie, actions, batch_size, seed):
+    batch_sim, library = _worker
+    return simulate_actions(batch_sim, library.get(course_id), ball_pos, lie, actions, batch_size, np.random.default_rng(seed))
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class Planner:
+    def __init__(self, profile_file=DEFAULT_PROFILE, par=4, difficulty=2, num_angles=13, angle_spread=60,
+                 batch_size=32, horizon=10, time_budget=0.5, min_rounds=2, workers=0, seed=None):
+        self.profile_file = profile_file
+        self.batch_sim = BatchSim(load_profile(profile_file), horizon=horizon)
+        self.library = CourseLibrary(par=par, difficulty=difficulty, cache_size=4)
+        # candidate aim angles are offsets (degrees) around the direction of the hole
+        self.angle_offsets = np.radians(np.linspace(-angle_spread, angle_spread, num_angles))
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.min_rounds = min_rounds
+        self.rng = np.random.default_rng(seed)
+
+        # a persistent pool, so workers only build their course once per hole
+        self.workers = workers
+        self.pool = None
+        if workers > 0:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                            initargs=(profile_file, par, difficulty, horizon))
+
+    def candidate_actions(self, course, ball_pos):
+        hole = np.asarray(course.green.hole_position, dtype=float)
+        hole_angle = math.atan2(hole[1] - ball_pos[1], hole[0] - ball_pos[0])
+        clubs, offsets = np.meshgrid(np.arange(len(self.batch_sim.clubs)), self.angle_offsets, indexing="ij")
+        return np.stack([clubs.ravel(), hole_angle + offsets.ravel()], axis=1)
+
+    def simulate(self, course_id, course, ball_pos, lie, actions):
+        # one round of batch_size simulations per action, spread over the workers if there are any
+        if self.pool is None:
+            return simulate_actions(self.batch_sim, course, ball_pos, lie, actions, self.batch_size, self.rng)
+
+        groups = np.array_split(np.arange(len(actions)), min(self.workers, len(actions)))
+        seeds = self.rng.integers(2**31, size=len(groups))
+        futures = [self.pool.submit(simulate_in_worker, course_id, tuple(ball_pos), lie, actions[group], self.batch_size, int(seed))
+                   for group, seed in zip(groups, seeds)]
+        results = [future.result() for future in futures]
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    def plan(self, course_id, ball_pos, lie):
+        # search for the best (club, angle) from ball_pos within the time budget. returns the club name, the angle
+        # (radians) and statistics of the search
+        start = time.perf_counter()
+        course = self.library.get(course_id)
+        lie_index = LIES.index(lie)
+        actions = self.candidate_actions(course, ball_pos)
+
+        sums = np.zeros(len(actions))
+        squares = np.zeros(len(actions))
+        penalties = np.zeros(len(actions))
+        counts = np.zeros(len(actions))
+        alive = np.arange(len(actions))
+        rounds = 0
+
+        while True:
+            round_sums, round_squares, round_penalties = self.simulate(course_id, course, ball_pos, lie_index, actions[alive])
+            sums[alive] += round_sums
+            squares[alive] += round_squares
+            penalties[alive] += round_penalties
+            counts[alive] += self.batch_size
+            rounds += 1
+
+            # drop the actions whose mean is clearly worse than the best one
+            means = sums[alive] / counts[alive]
+            errors = np.sqrt(np.maximum(squares[alive] / counts[alive] - means**2, 0) / counts[alive])
+            best = means.argmin()
+            alive = alive[means - 2 * errors <= means[best] + 2 * errors[best]]
+
+            elapsed = time.perf_counter() - start
+            if len(alive) == 1 or (rounds >= self.min_rounds and elapsed >= self.time_budget):
+                break
+
+        means = sums[alive] / counts[alive]
+        chosen = alive[means.argmin()]
+        club, angle = int(actions[chosen, 0]), float(actions[chosen, 1])
+        stats = {
+            "expected_strokes": sums[chosen] / counts[chosen],
+            "penalty_risk": penalties[chosen] / counts[chosen],
+            "simulations": int(counts.sum()),
+            "rounds": rounds,
+            "seconds": elapsed,
+            "simulations_per_second": counts.sum() / elapsed,
+        }
+        return self.batch_sim.clubs[club], angle, stats
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+def play_hole(planner, sim, writer=None, episode=0):
+    # play one hole of the simulator with the planner, optionally recording the shots as expert data
+    sim.reset()
+    total_simulations, total_seconds = 0, 0.0
+    while True:
+        club, angle, stats = planner.plan(sim.course_id, sim.ball_pos, sim.lie)
+        total_simulations += stats["simulations"]
+        total_seconds += stats["seconds"]
+
+        ball_x, ball_y, lie, step = sim.ball_pos[0], sim.ball_pos[1], sim.lie, sim.num_shots
+        landing, next_lie, reward, terminated, truncated = sim.step(club, angle)
+        if writer is not None:
+            writer.append((episode, step, sim.course_id, ball_x, ball_y, TERRAIN_IDS[lie], sim.clubs.index(club),
+                           angle % (2 * math.pi), landing[0], landing[1], TERRAIN_IDS[next_lie], reward, terminated, truncated))
+        if terminated or truncated:
+            return sim.score, total_simulations / max(total_seconds, 1e-9)
+
+def main():
+    parser = argparse.ArgumentParser(description="Play holes with the Monte-Carlo planner.")
+    parser.add_argument("--holes", type=int, default=10)
+    parser.add_argument("--time-budget", type=float, default=0.5, help="seconds of search per shot")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 searches in this process)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", default=None, help="directory to record the planner's shots to")
+    args = parser.parse_args()
+
+    sim = GolfSim(seed=args.seed)
+    planner = Planner(time_budget=args.time_budget, batch_size=args.batch_size, workers=args.workers, seed=args.seed)
+    writer = None
+    if args.record is not None:
+        from .rollouts import RolloutWriter
+        writer = RolloutWriter(args.record, par=sim.par, difficulty=sim.difficulty, clubs=sim.clubs)
+
+    scores = []
+    try:
+        for hole in range(args.holes):
+            episode = hole if writer is None else writer.next_episode + hole
+            score, speed = play_hole(planner, sim, writer, episode=episode)
+            scores.append(score)
+            print(f"hole {hole}: score {score}  ({speed:,.0f} simulations/s)")
+    finally:
+        planner.close()
+        if writer is not None:
+            writer.close()
+    print(f"mean score: {np.mean(scores):.2f}")
+
+
+if __name__ == "__main__":
+    main()
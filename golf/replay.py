@@ -0,0 +1,242 @@
+# ------------------------------------------------------------------------------------
+# File: replay.py
+# Description: This file contains the Replay class, an offscreen viewer for rollout recordings (see rollouts.py).
+# Every recorded row holds the full state before its shot, so any shot of any episode can be shown directly,
+# without replaying the episode from its start. Frames are drawn with NumPy on top of the course image, at any
+# number of frames per shot, and can be exported as a contact sheet (one tile per shot), as a PNG sequence or as a
+# video (when ffmpeg is installed). pygame is only used to write images and to label contact sheets.
+#
+# Scanning for outliers (e.g. episodes with repeated water hazards) only reads the columns it needs, chunk by
+# chunk, so thousands of episodes are scanned in a fraction of a second.
+#
+# Usage:
+#   python -m golf.replay rollouts/planner scan --min-water 2
+#   python -m golf.replay rollouts/planner sheet --episodes 3 7 --output sheet.png
+#   python -m golf.replay rollouts/planner video --episode 3 --frames-per-shot 30 --output episode_3.mp4
+#   python -m golf.replay rollouts/planner frame --episode 3 --shot 2 --output shot.png
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import itertools
+import os
+import shutil
+import subprocess
+import numpy as np
+from .constants import WHITE, RED, BLACK, OUT_OF_BOUNDS, WATER_HAZARD
+from .rollouts import RolloutReader
+
+# colors of the shot lines: played shots, and penalty shots (out of bounds and water hazards)
+SHOT_COLOR = WHITE
+PENALTY_COLOR = RED
+BALL_RADIUS = 3
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def draw_disc(image, center, radius, color):
+    # fill a disc in an image indexed [x, y]
+    x0, y0 = int(center[0]), int(center[1])
+    offsets = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(offsets, offsets, indexing="ij")
+    inside = dx**2 + dy**2 <= radius**2
+    xs, ys = x0 + dx[inside], y0 + dy[inside]
+    visible = (xs >= 0) & (xs < image.shape[0]) & (ys >= 0) & (ys < image.shape[1])
+    image[xs[visible], ys[visible]] = color
+
+def draw_segment(image, start, end, color, dash=0):
+    # draw a one pixel line in an image indexed [x, y]. with dash > 0, the line is dashed with dashes of that length
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    num_points = max(int(np.hypot(*(end - start))), 1) + 1
+    t = np.linspace(0, 1, num_points)
+    if dash > 0:
+        t = t[(np.arange(num_points) // dash) % 2 == 0]
+    xs = np.round(start[0] + t * (end[0] - start[0])).astype(int)
+    ys = np.round(start[1] + t * (end[1] - start[1])).astype(int)
+    visible = (xs >= 0) & (xs < image.shape[0]) & (ys >= 0) & (ys < image.shape[1])
+    image[xs[visible], ys[visible]] = color
+
+def save_image(image, path):
+    import pygame
+    pygame.image.save(pygame.surfarray.make_surface(image), path)
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class Replay:
+    def __init__(self, directory):
+        self.reader = RolloutReader(directory)
+        self.clubs = self.reader.metadata["clubs"]
+        # rows of every episode, by episode id
+        starts, ends = self.reader.episode_bounds()
+        episodes = self.reader["episode"]
+        self.episodes = {int(episodes[start]): (int(start), int(end)) for start, end in zip(starts, ends)}
+
+    def shots(self, episode):
+        # the recorded rows of an episode, as a structured array
+        start, end = self.episodes[episode]
+        names = ("course_id", "ball_x", "ball_y", "club", "landing_x", "landing_y", "landing_lie")
+        shots = np.empty(end - start, dtype=[(name, self.reader[name].dtype) for name in names])
+        for name in names:
+            shots[name] = self.reader[name][start:end]
+        return shots
+
+    def frame(self, episode, shot, progress=1.0, shots=None):
+        # RGB image (indexed [x, y]) of an episode while shot number `shot` is in the air, `progress` of the way
+        # from the ball to its landing. shot == len(shots) shows the end of the episode
+        shots = self.shots(episode) if shots is None else shots
+        image = self.reader.library.get(int(shots["course_id"][0])).image.copy()
+
+        # the shots played so far
+        for row in shots[:shot]:
+            penalty = row["landing_lie"] in (OUT_OF_BOUNDS, WATER_HAZARD)
+            draw_segment(image, (row["ball_x"], row["ball_y"]), (row["landing_x"], row["landing_y"]),
+                         PENALTY_COLOR if penalty else SHOT_COLOR, dash=4 if penalty else 0)
+            if penalty:
+                draw_disc(image, (row["landing_x"], row["landing_y"]), 2, PENALTY_COLOR)
+
+        # the ball, in the air during the current shot or at rest at the end of the episode
+        if shot < len(shots):
+            row = shots[shot]
+            ball = np.array([row["ball_x"], row["ball_y"]], dtype=float)
+            position = ball + progress * (np.array([row["landing_x"], row["landing_y"]], dtype=float) - ball)
+            draw_segment(image, ball, position, SHOT_COLOR)
+        else:
+            row = shots[-1]
+            penalty = row["landing_lie"] in (OUT_OF_BOUNDS, WATER_HAZARD)
+            position = (row["ball_x"], row["ball_y"]) if penalty else (row["landing_x"], row["landing_y"])
+        draw_disc(image, position, BALL_RADIUS, WHITE)
+        return image
+
+    def frames(self, episode, frames_per_shot=30, start_shot=0):
+        # frames of an episode from start_shot to the end, with frames_per_shot frames per shot
+        shots = self.shots(episode)
+        for shot in range(start_shot, len(shots)):
+            for index in range(frames_per_shot):
+                yield self.frame(episode, shot, index / frames_per_shot, shots)
+        yield self.frame(episode, len(shots), shots=shots)
+
+    def contact_sheet(self, episodes, columns=6, downsample=4, labels=True):
+        # one tile per shot (at its landing) of every episode, plus the end of the episode, laid out in a grid
+        tiles, captions = [], []
+        for episode in episodes:
+            shots = self.shots(episode)
+            for shot in range(len(shots) + 1):
+                tiles.append(self.frame(episode, shot, shots=shots)[::downsample, ::downsample])
+                club = self.clubs[shots["club"][shot]] if self.clubs is not None and shot < len(shots) else ""
+                captions.append(f"ep {episode} shot {shot} {club}" if shot < len(shots) else f"ep {episode} end")
+
+        width, height = tiles[0].shape[:2]
+        rows = (len(tiles) + columns - 1) // columns
+        sheet = np.full((columns * (width + 2), rows * (height + 2), 3), 255, dtype=np.uint8)
+        for index, tile in enumerate(tiles):
+            x, y = (index % columns) * (width + 2), (index // columns) * (height + 2)
+            sheet[x:x + width, y:y + height] = tile
+
+        if labels:
+            import pygame
+            pygame.font.init()
+            font = pygame.font.Font(None, 16)
+            surface = pygame.surfarray.make_surface(sheet)
+            for index, caption in enumerate(captions):
+                x, y = (index % columns) * (width + 2), (index // columns) * (height + 2)
+                surface.blit(font.render(caption, True, BLACK, WHITE), (x + 2, y + 2))
+            sheet = pygame.surfarray.array3d(surface)
+        return sheet
+
+    def export_video(self, path, frames, fps=30):
+        # write frames to a video with ffmpeg if it is installed, otherwise to a directory of PNG images
+        frames = iter(frames)
+        first = next(frames)
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            os.makedirs(path, exist_ok=True)
+            for index, frame in enumerate(itertools.chain([first], frames)):
+                save_image(frame, os.path.join(path, f"frame_{index:06d}.png"))
+            return path
+
+        width, height = first.shape[:2]
+        command = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+                   "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p", path]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as process:
+            for frame in itertools.chain([first], frames):
+                # frames are indexed [x, y], video rows are y
+                process.stdin.write(np.ascontiguousarray(frame.transpose(1, 0, 2)).tobytes())
+            process.stdin.close()
+        return path
+
+    def scan(self):
+        # per episode statistics, computed from the columns only: (episode ids, shots, water hazards, out of
+        # bounds, whether the hole was completed)
+        reader = self.reader
+        totals = {}
+        for index in range(len(reader.chunks)):
+            episodes = np.asarray(reader.chunk(index, "episode"))
+            landing_lie = np.asarray(reader.chunk(index, "landing_lie"))
+            terminated = np.asarray(reader.chunk(index, "terminated"))
+            ids, inverse = np.unique(episodes, return_inverse=True)
+            counts = np.stack([
+                np.bincount(inverse, minlength=len(ids)),
+                np.bincount(inverse, weights=landing_lie == WATER_HAZARD, minlength=len(ids)),
+                np.bincount(inverse, weights=landing_lie == OUT_OF_BOUNDS, minlength=len(ids)),
+                np.bincount(inverse, weights=terminated, minlength=len(ids)),
+            ], axis=1).astype(np.int64)
+            # an episode may continue in the next chunk
+            for episode, row in zip(ids.tolist(), counts):
+                totals[episode] = totals[episode] + row if episode in totals else row
+
+        ids = np.array(sorted(totals), dtype=np.int64)
+        counts = np.array([totals[episode] for episode in ids.tolist()]).reshape(-1, 4)
+        return ids, counts[:, 0], counts[:, 1], counts[:, 2], counts[:, 3] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded episodes offscreen.")
+    parser.add_argument("directory", help="rollout recording")
+    commands = parser.add_subparsers(dest="command", required=True)
+    scan = commands.add_parser("scan", help="list outlier episodes")
+    scan.add_argument("--min-water", type=int, default=2, help="report episodes with at least this many water hazards")
+    scan.add_argument("--min-shots", type=int, default=None, help="also report episodes with at least this many shots")
+    sheet = commands.add_parser("sheet", help="export a contact sheet")
+    sheet.add_argument("--episodes", type=int, nargs="+", required=True)
+    sheet.add_argument("--columns", type=int, default=6)
+    sheet.add_argument("--downsample", type=int, default=4)
+    sheet.add_argument("--output", default="sheet.png")
+    video = commands.add_parser("video", help="export a video (or PNG frames without ffmpeg)")
+    video.add_argument("--episode", type=int, required=True)
+    video.add_argument("--start-shot", type=int, default=0)
+    video.add_argument("--frames-per-shot", type=int, default=30)
+    video.add_argument("--fps", type=int, default=30)
+    video.add_argument("--output", default="episode.mp4")
+    frame = commands.add_parser("frame", help="export a single shot")
+    frame.add_argument("--episode", type=int, required=True)
+    frame.add_argument("--shot", type=int, default=0)
+    frame.add_argument("--progress", type=float, default=1.0)
+    frame.add_argument("--output", default="frame.png")
+    args = parser.parse_args()
+
+    replay = Replay(args.directory)
+    if args.command == "scan":
+        ids, shots, water, out_of_bounds, completed = replay.scan()
+        outliers = water >= args.min_water
+        if args.min_shots is not None:
+            outliers |= shots >= args.min_shots
+        print(f"{len(ids)} episodes, {outliers.sum()} outliers")
+        print(f"{'episode':>8} {'shots':>6} {'water':>6} {'out':>4} {'completed':>10}")
+        for index in np.flatnonzero(outliers)[np.argsort(-water[outliers], kind="stable")]:
+            print(f"{ids[index]:8d} {shots[index]:6d} {water[index]:6d} {out_of_bounds[index]:4d} {str(completed[index]):>10}")
+    elif args.command == "sheet":
+        save_image(replay.contact_sheet(args.episodes, args.columns, args.downsample), args.output)
+        print(f"wrote {args.output}")
+    elif args.command == "video":
+        path = replay.export_video(args.output, replay.frames(args.episode, args.frames_per_shot, args.start_shot), args.fps)
+        print(f"wrote {path}")
+    else:
+        save_image(replay.frame(args.episode, args.shot, args.progress), args.output)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# ------------------------------------------------------------------------------------
+# File: roll.py
+# Description: This file contains the optional roll model. Without it, a shot is a single jump to its landing point.
+# With it, a ball which lands on the teebox, the fairway, the rough or a bunker keeps rolling in the direction of
+# the shot, slowed down by the rolling resistance of the terrain it is on and pushed by the slope of the course.
+#
+# The slope comes from a smooth height map (a sum of Gaussian bumps drawn from the course's seed), precomputed once
+# per course on a coarse grid. Rolls are integrated for whole batches of balls at once, and every ball drops out
+# of the batch as soon as it stops, leaves the course, reaches a water hazard or reaches the green.
+# -------------------------------------------------------------------------------------
+
+# import packages
+import math
+import numpy as np
+from .constants import SCREEN_WIDTH, SCREEN_HEIGHT, FAIRWAY
+
+# rolling resistance of each terrain class, as a deceleration in pixels per unit of time squared (balls stop at once
+# in bunkers)
+ROLL_FRICTION = np.array([0.0, 1.0, 1.0, 3.0, 50.0, 0.5, 0.0, 0.5, 0.5])
+# terrain classes on which a ball stops rolling: out of bounds, the green (the hole is complete) and water hazards
+ROLL_STOPS = np.array([True, False, False, False, False, True, True, True, True])
+# on flat fairway, a ball rolls this fraction of the distance it carried
+ROLL_FRACTION = 0.1
+# integration time step and maximum number of integration steps of a roll
+ROLL_DT = 2.0
+ROLL_STEPS = 16
+
+# the height map is stored on a grid of SLOPE_CELL pixels, with Gaussian bumps of these widths and heights (pixels)
+SLOPE_CELL = 8
+BUMP_WIDTHS = (60, 160)
+BUMP_HEIGHT = 40
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def roll_speed(distance):
+    # initial speed (pixels per unit of time) of a ball which carried distance pixels, chosen so that on flat fairway it
+    # rolls ROLL_FRACTION of the carry (a constant deceleration a stops a ball of speed v after v^2 / 2a)
+    return np.sqrt(2 * ROLL_FRICTION[FAIRWAY] * ROLL_FRACTION * np.asarray(distance, dtype=float))
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class RollFields:
+    def __init__(self, course, seed=None, num_bumps=8):
+        self.course = course
+        rng = np.random.default_rng(seed)
+
+        # smooth height map: a sum of Gaussian bumps, each separable into an x and a y profile
+        xs = (np.arange(math.ceil(SCREEN_WIDTH / SLOPE_CELL)) + 0.5) * SLOPE_CELL
+        ys = (np.arange(math.ceil(SCREEN_HEIGHT / SLOPE_CELL)) + 0.5) * SLOPE_CELL
+        centers = rng.uniform((0, 0), (SCREEN_WIDTH, SCREEN_HEIGHT), size=(num_bumps, 2))
+        widths = rng.uniform(*BUMP_WIDTHS, size=num_bumps)
+        heights = rng.normal(0, BUMP_HEIGHT, size=num_bumps)
+        profiles_x = np.exp(-0.5 * ((xs[None, :] - centers[:, :1]) / widths[:, None])**2)
+        profiles_y = np.exp(-0.5 * ((ys[None, :] - centers[:, 1:]) / widths[:, None])**2)
+        self.height = np.einsum("k,kx,ky->xy", heights, profiles_x, profiles_y)
+
+        # downhill acceleration of a ball in every cell, (cells x, cells y, 2)
+        slope_x, slope_y = np.gradient(self.height, SLOPE_CELL)
+        self.acceleration = -np.stack([slope_x, slope_y], axis=-1)
+        # the same fields as nested lists, for the scalar path of roll_single
+        self.acceleration_list = self.acceleration.tolist()
+
+    def roll(self, positions, angles, speeds, terrain=None):
+        # roll balls from their landing positions (n, 2) in the direction of their shots (angles, radians) with
+        # initial speeds (n,). returns the positions the balls come to rest at and their terrain classes
+        positions = np.array(positions, dtype=float)
+        speeds = np.broadcast_to(speeds, len(positions))
+        angles = np.broadcast_to(angles, len(positions))
+        terrain = np.array(self.course.get_terrain_at(positions) if terrain is None else terrain)
+
+        # the balls still rolling, compacted after every step
+        index = np.flatnonzero(~ROLL_STOPS[terrain])
+        position = positions[index]
+        velocity = speeds[index, None] * np.stack([np.cos(angles[index]), np.sin(angles[index])], axis=1)
+        ball_terrain = terrain[index]
+
+        for _ in range(ROLL_STEPS):
+            if len(index) == 0:
+                break
+            # rolling balls are on the course, so their cells are inside the grid
+            friction = ROLL_FRICTION[ball_terrain] * ROLL_DT
+            cells = (position * (1 / SLOPE_CELL)).astype(int)
+            acceleration = self.acceleration[cells[:, 0], cells[:, 1]] * ROLL_DT
+
+            # friction slows the ball down along its direction of motion (without reversing it), then the slope
+            # pushes it downhill. a ball at rest stays there unless the slope is steeper than the friction
+            speed = np.hypot(velocity[:, 0], velocity[:, 1])
+            slowed = np.maximum(speed - friction, 0)
+            next_velocity = velocity * (slowed / np.maximum(speed, 1e-9))[:, None] + acceleration
+            resting = (slowed == 0) & (np.hypot(acceleration[:, 0], acceleration[:, 1]) <= friction)
+            next_velocity[resting] = 0
+
+            # trapezoidal step: exact on flat ground while the ball is still moving
+            position = position + (velocity + next_velocity) * (ROLL_DT / 2)
+            velocity = next_velocity
+            ball_terrain = self.course.get_terrain_at(position)
+
+            done = resting | ROLL_STOPS[ball_terrain]
+            if done.any():
+                positions[index[done]] = position[done]
+                terrain[index[done]] = ball_terrain[done]
+                keep = ~done
+                index, position, velocity, ball_terrain = index[keep], position[keep], velocity[keep], ball_terrain[keep]
+
+        # balls still rolling after ROLL_STEPS stop where they are
+        positions[index] = position
+        terrain[index] = ball_terrain
+        return positions, terrain
+
+    def roll_single(self, position, angle, speed):
+        # the same integration as roll() for a single ball in plain Python, which is much faster than NumPy on arrays
+        # of one element (used by GolfSim.step). returns the resting position and its terrain class
+        x, y = float(position[0]), float(position[1])
+        terrain = self.course.terrain
+        frictions, stops = ROLL_FRICTION.tolist(), ROLL_STOPS.tolist()
+        width, height = terrain.shape
+        vx, vy = float(speed) * math.cos(angle), float(speed) * math.sin(angle)
+        ball_terrain = int(terrain[int(x), int(y)]) if 0 <= x < width and 0 <= y < height else 0
+
+        for _ in range(ROLL_STEPS):
+            if stops[ball_terrain]:
+                break
+            friction = frictions[ball_terrain] * ROLL_DT
+            ax, ay = self.acceleration_list[int(x * (1 / SLOPE_CELL))][int(y * (1 / SLOPE_CELL))]
+            ax, ay = ax * ROLL_DT, ay * ROLL_DT
+
+            speed = math.hypot(vx, vy)
+            slowed = max(speed - friction, 0)
+            resting = slowed == 0 and math.hypot(ax, ay) <= friction
+            scale = slowed / max(speed, 1e-9)
+            next_vx, next_vy = (0.0, 0.0) if resting else (vx * scale + ax, vy * scale + ay)
+
+            x += (vx + next_vx) * (ROLL_DT / 2)
+            y += (vy + next_vy) * (ROLL_DT / 2)
+            vx, vy = next_vx, next_vy
+            ball_terrain = int(terrain[int(x), int(y)]) if 0 <= x < width and 0 <= y < height else 0
+            if resting:
+                break
+
+        return np.array([x, y]), ball_terrain
@@ -0,0 +1,227 @@
+# ------------------------------------------------------------------------------------
+# File: rollouts.py
+# Description: This file contains the RolloutWriter and RolloutReader classes, an append-only columnar store for
+# recorded shots. Rows are appended to an in-memory buffer, and every full chunk is handed to a background thread
+# which writes one .npy file per column. Courses are stored as a course id (see course_library.py), never as
+# pixels. The reader memory-maps the chunks, so large recordings load without copying them into memory: columns
+# are indexed chunk by chunk, and only converting a whole column to an array concatenates its chunks.
+#
+# Layout of a recording:
+#   directory/recording.json            metadata (columns, course library params, clubs)
+#   directory/chunk_000000/<column>.npy one file per column
+# -------------------------------------------------------------------------------------
+
+# import packages
+import json
+import os
+import queue
+import threading
+import numpy as np
+from .constants import TERRAIN_NAMES
+from .course_library import CourseLibrary
+
+# one row per shot. lies are stored as terrain classes (see constants.py)
+COLUMNS = np.dtype([
+    ("episode", np.int64),
+    ("step", np.int32),
+    ("course_id", np.int64),
+    ("ball_x", np.float32),
+    ("ball_y", np.float32),
+    ("lie", np.uint8),
+    ("club", np.int8),
+    ("aim", np.float32),
+    ("landing_x", np.float32),
+    ("landing_y", np.float32),
+    ("landing_lie", np.uint8),
+    ("reward", np.float32),
+    ("terminated", np.bool_),
+    ("truncated", np.bool_),
+])
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class RolloutWriter:
+    def __init__(self, directory, chunk_size=65536, par=4, difficulty=2, clubs=None, max_pending=4):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+
+        # continue numbering after the chunks (and the episodes) which are already on disk
+        chunks = list_chunks(directory)
+        self.num_chunks = len(chunks)
+        self.next_episode = 0
+        for chunk in chunks:
+            episodes = np.load(os.path.join(chunk, "episode.npy"), mmap_mode="r")
+            if len(episodes):
+                self.next_episode = max(self.next_episode, int(episodes[-1]) + 1)
+        self.metadata = {
+            "columns": [name for name in COLUMNS.names],
+            "par": par,
+            "difficulty": difficulty,
+            "clubs": list(clubs) if clubs is not None else None,
+            "terrain_names": list(TERRAIN_NAMES),
+        }
+        self.write_metadata()
+
+        # rows are buffered in a structured array (one assignment per row) and split into columns on write
+        self.buffer = np.empty(chunk_size, dtype=COLUMNS)
+        self.size = 0
+
+        # full chunks are written by a background thread. the queue is bounded so that a slow disk applies
+        # back pressure instead of piling up memory
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def append(self, row):
+        # row is a tuple with one value per column, in the order of COLUMNS
+        self.buffer[self.size] = row
+        self.size += 1
+        if self.size == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.error is not None:
+            raise self.error
+        if self.size == 0:
+            return
+        self.pending.put((self.num_chunks, self.buffer[:self.size]))
+        self.num_chunks += 1
+        self.buffer = np.empty(self.chunk_size, dtype=COLUMNS)
+        self.size = 0
+
+    def write_loop(self):
+        while True:
+            item = self.pending.get()
+            try:
+                if item is None:
+                    return
+                chunk_index, rows = item
+                # write the columns into a temporary directory first, so readers never see half a chunk
+                path = os.path.join(self.directory, f"chunk_{chunk_index:06d}")
+                os.makedirs(path + ".tmp", exist_ok=True)
+                for name in COLUMNS.names:
+                    np.save(os.path.join(path + ".tmp", name + ".npy"), np.ascontiguousarray(rows[name]))
+                os.replace(path + ".tmp", path)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.pending.task_done()
+
+    def write_metadata(self):
+        with open(os.path.join(self.directory, "recording.json"), "w") as file:
+            json.dump(self.metadata, file, indent=4)
+
+    def close(self):
+        # write the last partial chunk and wait for the background thread to finish
+        try:
+            self.flush()
+        finally:
+            self.pending.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RolloutReader:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "recording.json"), "r") as file:
+            self.metadata = json.load(file)
+        self.chunks = list_chunks(directory)
+        self._library = None
+        self._columns = {}
+
+    def chunk(self, index, name):
+        # memory-mapped view of one column of one chunk
+        return np.load(os.path.join(self.chunks[index], name + ".npy"), mmap_mode="r")
+
+    def __getitem__(self, name):
+        # a whole column over all chunks, indexed without copying the chunks (see Column)
+        if name not in self._columns:
+            self._columns[name] = Column([self.chunk(index, name) for index in range(len(self.chunks))], COLUMNS[name])
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self["episode"])
+
+    def episode_bounds(self):
+        # start and end row of every episode, found chunk by chunk (an episode may continue in the next chunk)
+        column = self["episode"]
+        starts, previous = [], None
+        for offset, episodes in zip(column.offsets, column.chunks):
+            if len(episodes) == 0:
+                continue
+            changes = np.flatnonzero(episodes[1:] != episodes[:-1]) + 1
+            if previous is None or episodes[0] != previous:
+                changes = np.r_[0, changes]
+            starts.append(offset + changes)
+            previous = episodes[-1]
+        starts = np.concatenate(starts) if starts else np.empty(0, dtype=int)
+        ends = np.r_[starts[1:], len(column)]
+        return starts, ends
+
+    @property
+    def library(self):
+        # the library which rebuilds the recorded courses from their ids
+        if self._library is None:
+            self._library = CourseLibrary(par=self.metadata["par"], difficulty=self.metadata["difficulty"])
+        return self._library
+
+
+class Column:
+    def __init__(self, chunks, dtype):
+        # memory-mapped chunks of a column, and the row each chunk starts at
+        self.chunks = chunks
+        self.dtype = np.dtype(dtype)
+        self.offsets = np.r_[0, np.cumsum([len(chunk) for chunk in chunks])].astype(int)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, key):
+        # a row, or a contiguous range of rows: a view when it lies in a single chunk, otherwise only the rows of
+        # the chunks it covers are copied. any other key indexes the whole column
+        if isinstance(key, (int, np.integer)):
+            row = int(key) + len(self) if key < 0 else int(key)
+            if not 0 <= row < len(self):
+                raise IndexError(f"row {key} is out of range for a column of {len(self)} rows")
+            index = int(np.searchsorted(self.offsets, row, side="right")) - 1
+            return self.chunks[index][row - self.offsets[index]]
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(len(self))
+            stop = max(start, stop)
+            first = int(np.searchsorted(self.offsets, start, side="right")) - 1
+            last = int(np.searchsorted(self.offsets, stop, side="left")) - 1
+            if first >= len(self.chunks) or stop == start:
+                return np.empty(0, dtype=self.dtype)
+            if first >= last:
+                return self.chunks[first][start - self.offsets[first]:stop - self.offsets[first]]
+            return np.concatenate([self.chunks[index][max(start - self.offsets[index], 0):stop - self.offsets[index]]
+                                   for index in range(first, last + 1)])
+        return np.asarray(self)[key]
+
+    def __array__(self, dtype=None, copy=None):
+        # the whole column in memory
+        if len(self.chunks) == 1:
+            array = np.asarray(self.chunks[0])
+        else:
+            array = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=self.dtype)
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def list_chunks(directory):
+    names = sorted(name for name in os.listdir(directory) if name.startswith("chunk_") and not name.endswith(".tmp"))
+    return [os.path.join(directory, name) for name in names]
@@ -0,0 +1,180 @@
+# ------------------------------------------------------------------------------------
+# File: sim.py
+# Description: This file contains the GolfSim class, a headless version of the game logic which is used by the
+# Gymnasium environment and by any worker that only needs to simulate shots. It only depends on NumPy: pygame, the
+# fonts and the UI are never imported, so spinning up many simulation workers is cheap.
+# -------------------------------------------------------------------------------------
+
+# import packages
+import collections
+import copy
+import json
+import math
+import numpy as np
+from .course_library import CourseLibrary, CoursePrefetcher
+from .constants import DEFAULT_PROFILE, LIES, TERRAIN_NAMES
+from .roll import roll_speed
+
+# snapshot of everything that determines how an episode continues. the course is referenced by id (rebuilt by
+# the course library), so a snapshot is a few numbers and restoring one costs microseconds
+SimState = collections.namedtuple("SimState", ["course_id", "ball_pos", "lie", "score", "num_shots", "shot_noise", "rng_state"])
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def frozen_noise(shot_noise):
+    # read-only copy of the shot noise, so a snapshot cannot change after it is taken (or restored)
+    if shot_noise is None:
+        return None
+    shot_noise = np.array(shot_noise, dtype=float)
+    shot_noise.setflags(write=False)
+    return shot_noise
+
+def load_profile(profile_file=DEFAULT_PROFILE):
+    with open(profile_file, 'r') as file:
+        return json.load(file)
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class GolfSim:
+    def __init__(self, profile_file=DEFAULT_PROFILE, par=4, difficulty=2, max_score=20, seed=None, roll=False, prefetch=0):
+        # load the player's profile
+        self.profile = load_profile(profile_file)
+        self.clubs = list(self.profile.keys())
+        # set course and episode params
+        self.par = par
+        self.difficulty = difficulty
+        self.max_score = max_score
+        # whether the ball rolls after landing (see roll.py)
+        self.roll = roll
+        # every random draw (courses and shots) goes through this generator
+        self.np_random = np.random.default_rng(seed)
+        # courses are referenced by id and rebuilt from it when needed
+        self.library = CourseLibrary(par=par, difficulty=difficulty)
+        # with prefetch > 0, random courses are generated ahead of time by a background process which keeps up to
+        # prefetch of them ready. which courses are drawn then depends on timing, fix course_id for reproducible runs
+        self.prefetcher = CoursePrefetcher(self.library, queue_size=prefetch, seed=seed) if prefetch > 0 else None
+
+        # game state
+        self.course_id = None
+        self.course = None
+        self.ball_pos = None
+        self.prev_pos = None
+        self.lie = None
+        self.score = 0
+        self.num_shots = 0
+        # optional pre-drawn standard normal noise for the shots of the episode, shape (shots, 2)
+        self.shot_noise = None
+        # club, lie and target of the last shot, kept for rendering
+        self.club = None
+        self.shot_lie = None
+        self.prev_target = None
+
+    def reset(self, seed=None, course_id=None, shot_noise=None):
+        # shot_noise holds one standard normal pair per shot. sharing it between runs makes them use common random
+        # numbers: the same shot of the same course gets the same draw, transformed by each run's own club and aim
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        # draw a new random (playable) course, unless one is given. prefetched courses depend on the timing of the
+        # worker, so seeded resets draw their course here to stay reproducible
+        if course_id is None:
+            if self.prefetcher is not None and seed is None:
+                course_id = self.prefetcher.next_id(self.np_random)
+            else:
+                course_id = self.library.sample_id(self.np_random)
+        self.course_id = course_id
+        self.course = self.library.get(self.course_id)
+        # place the ball at the teebox and reset the game state
+        self.ball_pos = np.array(self.course.start_position, dtype=float)
+        self.prev_pos = None
+        self.lie = "Teebox"
+        self.score = 0
+        self.num_shots = 0
+        self.shot_noise = shot_noise
+        self.club = None
+        self.shot_lie = None
+        self.prev_target = None
+        return self.ball_pos, self.lie
+
+    def step(self, club, angle):
+        # hit the ball with the given club, aimed at angle radians (on screen, y pointing down).
+        # returns the landing position, the lie it landed on, the reward and the termination flags
+        params = self.profile[club][self.lie]
+        self.club, self.shot_lie = club, self.lie
+
+        # sample the landing position from the rotated Gaussian of the club and lie, the scalar form of
+        # aiming.sample_landings
+        cos, sin = math.cos(angle), math.sin(angle)
+        if self.shot_noise is not None and self.num_shots < len(self.shot_noise):
+            horizontal, vertical = self.shot_noise[self.num_shots]
+        else:
+            horizontal, vertical = self.np_random.standard_normal(2)
+        self.num_shots += 1
+        horizontal *= params["horizontal_std"]
+        vertical *= params["vertical_std"]
+        x = self.ball_pos[0] + params["distance"] * cos + horizontal * cos + vertical * sin
+        y = self.ball_pos[1] + params["distance"] * sin - horizontal * sin + vertical * cos
+        landing = np.array([x, y])
+        self.prev_target = (self.ball_pos[0] + 100 * cos, self.ball_pos[1] + 100 * sin)
+
+        next_lie = self.course.get_element_at((int(x), int(y)))
+
+        # the ball rolls on from where it landed, unless it is already out of play or on the green
+        if self.roll and next_lie in LIES:
+            landing, terrain = self.course.roll_fields.roll_single(landing, angle, roll_speed(params["distance"]))
+            next_lie = TERRAIN_NAMES[terrain]
+
+        # handle out of bounds and water hazards, the ball is played again from where it was
+        if next_lie == "Out of Bounds" or next_lie == "Water Hazard":
+            self.score += 2
+            reward = -2
+            terminated = False
+        # handle hole completion (end of the episode)
+        elif next_lie == "Green":
+            self.score += 1
+            self.move_to(landing, next_lie)
+            reward = 10
+            terminated = True
+        else:
+            self.score += 1
+            self.move_to(landing, next_lie)
+            reward = -1
+            terminated = False
+
+        # truncate the episode if the score is too high
+        truncated = self.score > self.max_score
+
+        return landing, next_lie, reward, terminated, truncated
+
+    def get_state(self):
+        return SimState(self.course_id, (float(self.ball_pos[0]), float(self.ball_pos[1])), self.lie, self.score,
+                        self.num_shots, frozen_noise(self.shot_noise), copy.deepcopy(self.np_random.bit_generator.state))
+
+    def set_state(self, state):
+        # continue from a snapshot. the last shot is forgotten, so there is nothing to animate until the next one
+        if state.course_id != self.course_id:
+            self.course_id = state.course_id
+            self.course = self.library.get(state.course_id)
+        self.ball_pos = np.array(state.ball_pos)
+        self.lie = state.lie
+        self.score = state.score
+        self.num_shots = state.num_shots
+        self.shot_noise = frozen_noise(state.shot_noise)
+        self.np_random.bit_generator.state = copy.deepcopy(state.rng_state)
+        self.prev_pos = None
+        self.club = None
+        self.shot_lie = None
+        self.prev_target = None
+
+    def close(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
+    def move_to(self, pos, lie):
+        self.prev_pos = self.ball_pos
+        self.ball_pos = pos
+        self.lie = lie
@@ -0,0 +1,206 @@
+# ------------------------------------------------------------------------------------
+# File: tournament.py
+# Description: This file contains a batch tournament simulator. Several player profiles play many rounds over the
+# same seeded holes with the greedy policy of BatchSim (aim at the hole with the club whose distance is closest),
+# each hole being played by a whole chunk of rounds at once with vectorized shot sampling. Chunks of rounds are
+# spread over worker processes, and each chunk reuses the same random seed for every profile, so profiles are
+# compared with common random numbers.
+#
+# Results are streamed to disk as they come in, so memory stays bounded however many rounds are played:
+#   directory/tournament.json            metadata (profiles, course ids, par)
+#   directory/chunk_000000/scores.npy    (profiles, rounds, holes) strokes per hole
+#   directory/chunk_000000/clubs.npy     (profiles, clubs) number of shots per club, in the order of tournament.json
+#   directory/summary.json               score distributions, club usage and handicaps, written at the end
+#
+# Handicaps follow the World Handicap System: the differential of a round is its score minus the par of the
+# course, and a handicap is the average of the best 8 differentials out of 20 consecutive rounds.
+#
+# Usage:
+#   python -m golf.tournament golf/profile.json other_profile.json --rounds 100000 --holes 18 --workers 8
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .batch_sim import BatchSim
+from .course_library import CourseLibrary
+from .sim import load_profile
+
+# rounds per handicap window, and the number of best differentials averaged in a window
+HANDICAP_WINDOW = 20
+HANDICAP_BEST = 8
+
+# state of a worker process, created once by init_worker
+_worker = None
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def init_worker(profile_files, par, difficulty, course_ids, max_score):
+    global _worker
+    library = CourseLibrary(par=par, difficulty=difficulty, cache_size=len(course_ids))
+    batch_sims = [BatchSim(load_profile(profile_file)) for profile_file in profile_files]
+    _worker = (batch_sims, [library.get(course_id) for course_id in course_ids], max_score)
+
+def play_hole(batch_sim, course, num_balls, rng, max_score=20):
+    # play a hole from the teebox with num_balls balls at once, using the greedy policy. returns the strokes of
+    # every ball and the number of shots per club. like GolfSim, a ball stops once its score is above max_score
+    positions = np.tile(np.asarray(course.start_position, dtype=float), (num_balls, 1))
+    lies = np.zeros(num_balls, dtype=int)
+    strokes = np.zeros(num_balls, dtype=int)
+    club_counts = np.zeros(len(batch_sim.clubs), dtype=np.int64)
+    active = np.arange(num_balls)
+
+    while len(active):
+        clubs, angles = batch_sim.greedy_actions(course, positions[active], lies[active])
+        club_counts += np.bincount(clubs, minlength=len(batch_sim.clubs))
+        _, _, added, holed, next_positions, next_lies = batch_sim.play_shots(
+            course, positions[active], lies[active], clubs, angles, rng.standard_normal((len(active), 2)))
+        strokes[active] += added
+        positions[active] = next_positions
+        lies[active] = next_lies
+        active = active[~holed & (strokes[active] <= max_score)]
+
+    return strokes, club_counts
+
+def play_rounds(num_rounds, seed):
+    # play num_rounds rounds with every profile of the worker. returns the (profiles, rounds, holes) strokes and the
+    # shots per club of every profile
+    batch_sims, courses, max_score = _worker
+    scores = np.zeros((len(batch_sims), num_rounds, len(courses)), dtype=np.uint8)
+    club_counts = []
+    for index, batch_sim in enumerate(batch_sims):
+        # the same seed for every profile: common random numbers
+        rng = np.random.default_rng(seed)
+        counts = np.zeros(len(batch_sim.clubs), dtype=np.int64)
+        for hole, course in enumerate(courses):
+            strokes, hole_counts = play_hole(batch_sim, course, num_rounds, rng, max_score)
+            scores[index, :, hole] = strokes
+            counts += hole_counts
+        club_counts.append(counts)
+    return scores, club_counts
+
+def handicap_differentials(round_scores, course_par):
+    # average of the best HANDICAP_BEST differentials of every full window of HANDICAP_WINDOW rounds
+    num_windows = len(round_scores) // HANDICAP_WINDOW
+    windows = np.sort(round_scores[:num_windows * HANDICAP_WINDOW].reshape(num_windows, HANDICAP_WINDOW), axis=1)
+    return windows[:, :HANDICAP_BEST].mean(axis=1) - course_par
+
+def profile_names(profile_files):
+    # file names without extension, made unique when two files share a name
+    names = []
+    for profile_file in profile_files:
+        name = os.path.splitext(os.path.basename(profile_file))[0]
+        names.append(name if name not in names else f"{name}_{len(names)}")
+    return names
+
+def run_tournament(profile_files, directory, num_rounds=1000, num_holes=18, par=4, difficulty=2, max_score=20,
+                   chunk_rounds=1000, workers=None, seed=0):
+    # play the tournament, streaming every chunk of rounds to directory, and return the summary
+    os.makedirs(directory, exist_ok=True)
+    # a tournament replaces the results of the previous tournament in the same directory. any other non-empty
+    # directory (e.g. a rollout recording, which uses the same chunk layout) is left alone
+    if os.path.exists(os.path.join(directory, "tournament.json")):
+        for name in os.listdir(directory):
+            if name.startswith("chunk_"):
+                shutil.rmtree(os.path.join(directory, name))
+    elif os.listdir(directory):
+        raise ValueError("{} is not empty and does not hold a previous tournament".format(directory))
+    names = profile_names(profile_files)
+    clubs = [list(load_profile(profile_file).keys()) for profile_file in profile_files]
+    # whole handicap windows per chunk, so that windows never straddle two chunks
+    chunk_rounds = max(HANDICAP_WINDOW, chunk_rounds // HANDICAP_WINDOW * HANDICAP_WINDOW)
+
+    # the holes of the tournament, drawn once and rebuilt from their ids by every worker
+    rng = np.random.default_rng(seed)
+    library = CourseLibrary(par=par, difficulty=difficulty, cache_size=num_holes)
+    course_ids = [library.sample_id(rng) for _ in range(num_holes)]
+    course_par = par * num_holes
+    with open(os.path.join(directory, "tournament.json"), "w") as file:
+        json.dump({"profiles": names, "profile_files": list(profile_files), "clubs": clubs, "course_ids": course_ids,
+                   "par": par, "difficulty": difficulty, "max_score": max_score}, file, indent=4)
+
+    # running statistics, updated as chunks come in
+    histograms = [np.zeros(0, dtype=np.int64) for _ in names]
+    club_counts = [np.zeros(len(profile_clubs), dtype=np.int64) for profile_clubs in clubs]
+    hole_sums = np.zeros((len(names), num_holes))
+    handicaps = [[] for _ in names]
+    played = 0
+
+    sizes = [min(chunk_rounds, num_rounds - start) for start in range(0, num_rounds, chunk_rounds)]
+    seeds = [int(seed) for seed in rng.integers(2**31, size=len(sizes))]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(sizes)), initializer=init_worker,
+                             initargs=(profile_files, par, difficulty, course_ids, max_score)) as pool:
+        for chunk_index, (scores, chunk_club_counts) in enumerate(pool.map(play_rounds, sizes, seeds)):
+            path = os.path.join(directory, f"chunk_{chunk_index:06d}")
+            os.makedirs(path + ".tmp", exist_ok=True)
+            np.save(os.path.join(path + ".tmp", "scores.npy"), scores)
+            # profiles may have different clubs, rows are padded to the longest club list
+            chunk_clubs = np.zeros((len(names), max(map(len, clubs))), dtype=np.int64)
+            for index, counts in enumerate(chunk_club_counts):
+                chunk_clubs[index, :len(counts)] = counts
+            np.save(os.path.join(path + ".tmp", "clubs.npy"), chunk_clubs)
+            os.replace(path + ".tmp", path)
+
+            round_scores = scores.sum(axis=2, dtype=np.int64)
+            for index in range(len(names)):
+                counts = np.bincount(round_scores[index])
+                if len(counts) > len(histograms[index]):
+                    histograms[index] = np.pad(histograms[index], (0, len(counts) - len(histograms[index])))
+                histograms[index][:len(counts)] += counts
+                club_counts[index] += chunk_club_counts[index]
+                handicaps[index].append(handicap_differentials(round_scores[index], course_par))
+            hole_sums += scores.sum(axis=1)
+            played += scores.shape[1]
+            print(f"{played}/{num_rounds} rounds ({played / (time.perf_counter() - start):,.0f} rounds/s)")
+
+    summary = {}
+    for index, name in enumerate(names):
+        histogram = histograms[index]
+        scores = np.arange(len(histogram))
+        mean = (scores * histogram).sum() / played
+        cumulative = np.cumsum(histogram) / played
+        differentials = np.concatenate(handicaps[index])
+        summary[name] = {
+            "rounds": played,
+            "mean_score": float(mean),
+            "std_score": float(np.sqrt((histogram * (scores - mean)**2).sum() / played)),
+            "percentiles": {str(q): int(np.searchsorted(cumulative, q / 100)) for q in (5, 25, 50, 75, 95)},
+            "score_histogram": {str(score): int(count) for score, count in zip(scores, histogram) if count},
+            "mean_hole_scores": (hole_sums[index] / played).tolist(),
+            "club_usage": {club: float(count / club_counts[index].sum()) for club, count in zip(clubs[index], club_counts[index])},
+            "handicap": float(differentials.mean()) if len(differentials) else None,
+        }
+    with open(os.path.join(directory, "summary.json"), "w") as file:
+        json.dump(summary, file, indent=4)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a tournament between player profiles.")
+    parser.add_argument("profiles", nargs="+", help="player profile JSON files")
+    parser.add_argument("--directory", default="tournaments/latest")
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--holes", type=int, default=18)
+    parser.add_argument("--chunk-rounds", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = run_tournament(args.profiles, args.directory, num_rounds=args.rounds, num_holes=args.holes,
+                             chunk_rounds=args.chunk_rounds, workers=args.workers, seed=args.seed)
+    print(f"{'profile':<20} {'mean':>7} {'std':>6} {'median':>7} {'handicap':>9}  most used club")
+    for name, stats in sorted(summary.items(), key=lambda item: item[1]["mean_score"]):
+        club = max(stats["club_usage"], key=stats["club_usage"].get)
+        handicap = f"{stats['handicap']:9.1f}" if stats["handicap"] is not None else f"{'-':>9}"
+        print(f"{name:<20} {stats['mean_score']:7.2f} {stats['std_score']:6.2f} {stats['percentiles']['50']:7d} {handicap}  {club}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
+import math
 import pygame
-from constants import *
+from .constants import *
 
 def draw_button(screen, button_rect, text, font, button_color=(200, 200, 200), text_color=BLACK):
     pygame.draw.rect(screen, button_color, button_rect)
@@ -39,4 +40,23 @@ def draw_hole_complete(screen, font):
 def draw_out_of_bounds(screen, font):
     text_surf = font.render("OUT OF BOUNDS!", True, RED)
     text_rect = text_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-    screen.blit(text_surf, text_rect)
\ No newline at end of file
+    screen.blit(text_surf, text_rect)
+
+def draw_caddie(screen, font, advice, objective, ball_pos):
+    # recommended shots as lines from the ball (the best one thicker) and a table in the top left corner
+    title = "Caddie: by expected strokes" if objective == "strokes" else "Caddie: by penalty risk"
+    lines = [title + " (TAB to switch)"]
+    if advice is None:
+        lines.append("thinking...")
+    else:
+        for rank, (club, angle, strokes, risk, _) in enumerate(advice["ranked"]):
+            end_pos = (ball_pos[0] + 60 * math.cos(angle), ball_pos[1] + 60 * math.sin(angle))
+            pygame.draw.line(screen, WHITE, ball_pos, end_pos, 3 if rank == 0 else 1)
+            lines.append(f"{rank + 1}. {club}: {math.degrees(angle) % 360:.0f} deg, {strokes:.2f} strokes, {100 * risk:.0f}% risk")
+        if advice["aim"] is not None:
+            club, _, strokes, risk, _ = advice["aim"]
+            lines.append(f"Your aim ({club}): {strokes:.2f} strokes, {100 * risk:.0f}% risk")
+
+    for index, line in enumerate(lines):
+        text_surf = font.render(line, True, BLACK)
+        screen.blit(text_surf, (10, 10 + index * (text_surf.get_height() + 2)))
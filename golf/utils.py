@@ -1,5 +1,5 @@
 import numpy as np
-from constants import WIDTH
+from .constants import WIDTH
 
 
 def bezier_curve(p0, p1, p2, p3, t):
@@ -37,4 +37,137 @@ def generate_height_envelope(point, left_bound, right_bound):
     if delta_y < 0:
         delta_y = 0
 
-    return delta_y
\ No newline at end of file
+    return delta_y
+
+
+class Rect:
+    # a minimal stand-in for pygame.Rect (integer coordinates, truncated like pygame does) so that
+    # courses can be generated without importing pygame
+    def __init__(self, left, top, width, height):
+        self.left = int(left)
+        self.top = int(top)
+        self.width = int(width)
+        self.height = int(height)
+
+    @property
+    def right(self):
+        return self.left + self.width
+
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+    @property
+    def centerx(self):
+        return self.left + self.width // 2
+
+    @property
+    def centery(self):
+        return self.top + self.height // 2
+
+    @property
+    def center(self):
+        return (self.centerx, self.centery)
+
+    @property
+    def topleft(self):
+        return (self.left, self.top)
+
+    @property
+    def midleft(self):
+        return (self.left, self.centery)
+
+    def colliderect(self, other):
+        return self.left < other.right and other.left < self.right and self.top < other.bottom and other.top < self.bottom
+
+def rotated_size(width, height, angle):
+    # size of the bounding box of a width x height surface rotated by angle degrees, as produced by pygame.transform.rotate
+    cos, sin = abs(np.cos(np.radians(angle))), abs(np.sin(np.radians(angle)))
+    return int(width * cos + height * sin + 1e-6), int(width * sin + height * cos + 1e-6)
+
+def fill_rotated_shape(grid, value, center, width, height, angle, ellipse=False):
+    # paint the cells of a width x height rectangle (or the ellipse inscribed in it) rotated clockwise on screen by
+    # angle degrees around center. the grid is indexed [x, y] like pygame.surfarray arrays
+    cos, sin = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    half_width, half_height = width / 2, height / 2
+
+    # only look at the bounding box of the rotated shape
+    extent_x = abs(half_width * cos) + abs(half_height * sin)
+    extent_y = abs(half_width * sin) + abs(half_height * cos)
+    x0, x1 = max(int(center[0] - extent_x), 0), min(int(center[0] + extent_x) + 1, grid.shape[0])
+    y0, y1 = max(int(center[1] - extent_y), 0), min(int(center[1] + extent_y) + 1, grid.shape[1])
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    # express the pixel centers in the frame of the shape
+    dx = (np.arange(x0, x1) + 0.5 - center[0])[:, None]
+    dy = (np.arange(y0, y1) + 0.5 - center[1])[None, :]
+    along = dx * cos + dy * sin
+    across = dy * cos - dx * sin
+
+    if ellipse:
+        mask = (along / half_width)**2 + (across / half_height)**2 <= 1
+    else:
+        mask = (np.abs(along) <= half_width) & (np.abs(across) <= half_height)
+    grid[x0:x1, y0:y1][mask] = value
+
+def fill_rotated_rects(grid, value, centers, widths, heights, angles):
+    # paint the union of many rotated rectangles at once (same geometry as fill_rotated_shape). in every pixel column
+    # a rectangle covers a single interval of rows, so the union is painted with a difference array over the columns
+    centers = np.asarray(centers, dtype=float)
+    cos, sin = np.cos(np.radians(angles)), np.sin(np.radians(angles))
+    half_width, half_height = np.asarray(widths) / 2, np.asarray(heights) / 2
+
+    # enumerate the (rectangle, column) pairs of every bounding box
+    extent_x = np.abs(half_width * cos) + np.abs(half_height * sin)
+    x0 = np.clip((centers[:, 0] - extent_x).astype(int), 0, grid.shape[0])
+    x1 = np.clip((centers[:, 0] + extent_x).astype(int) + 1, 0, grid.shape[0])
+    counts = np.maximum(x1 - x0, 0)
+    index = np.repeat(np.arange(len(centers)), counts)
+    columns = x0[index] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    # solve |along| <= half_width and |across| <= half_height for the row offset of the pixel centers
+    dx = columns + 0.5 - centers[index, 0]
+    c, s, hw, hh = cos[index], sin[index], half_width[index], half_height[index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        along_low, along_high = (-hw - dx * c) / s, (hw - dx * c) / s
+        across_low, across_high = (-hh + dx * s) / c, (hh + dx * s) / c
+    along_low, along_high = np.minimum(along_low, along_high), np.maximum(along_low, along_high)
+    across_low, across_high = np.minimum(across_low, across_high), np.maximum(across_low, across_high)
+    # axis aligned rectangles constrain only the column, not the row
+    flat = np.abs(s) < 1e-9
+    along_low = np.where(flat, np.where(np.abs(dx * c) <= hw, -np.inf, np.inf), along_low)
+    along_high = np.where(flat, np.inf, along_high)
+    upright = np.abs(c) < 1e-9
+    across_low = np.where(upright, np.where(np.abs(dx * s) <= hh, -np.inf, np.inf), across_low)
+    across_high = np.where(upright, np.inf, across_high)
+
+    # convert the offsets to an inclusive range of rows and accumulate it in the difference array
+    low = np.ceil(centers[index, 1] + np.maximum(along_low, across_low) - 0.5)
+    high = np.floor(centers[index, 1] + np.minimum(along_high, across_high) - 0.5)
+    low = np.clip(low, 0, grid.shape[1]).astype(int)
+    high = np.clip(high + 1, 0, grid.shape[1]).astype(int)
+    keep = low < high
+    columns, low, high = columns[keep], low[keep], high[keep]
+
+    width = grid.shape[1] + 1
+    diff = np.bincount(columns * width + low, minlength=grid.shape[0] * width)
+    diff -= np.bincount(columns * width + high, minlength=grid.shape[0] * width)
+    covered = np.cumsum(diff.reshape(grid.shape[0], width), axis=1)[:, :-1] > 0
+    grid[covered] = value
+
+def fill_triangle(grid, value, p0, p1, p2):
+    # paint the cells whose centers lie inside the triangle p0 p1 p2
+    points = np.array([p0, p1, p2], dtype=float)
+    x0, y0 = np.maximum(np.floor(points.min(axis=0)).astype(int), 0)
+    x1, y1 = np.minimum(np.ceil(points.max(axis=0)).astype(int) + 1, grid.shape)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    x = (np.arange(x0, x1) + 0.5)[:, None]
+    y = (np.arange(y0, y1) + 0.5)[None, :]
+    def edge(a, b):
+        return (b[0] - a[0]) * (y - a[1]) - (b[1] - a[1]) * (x - a[0])
+    e0, e1, e2 = edge(points[0], points[1]), edge(points[1], points[2]), edge(points[2], points[0])
+    mask = ((e0 >= 0) & (e1 >= 0) & (e2 >= 0)) | ((e0 <= 0) & (e1 <= 0) & (e2 <= 0))
+    grid[x0:x1, y0:y1][mask] = value
@@ -0,0 +1,66 @@
+# ------------------------------------------------------------------------------------
+# File: actions.py
+# Description: This file contains the ActionDecoder class, which defines the action space of GolfGameEnv for each
+# action mode and turns actions (single ones or whole batches) into club indices and aim angles with NumPy.
+#
+# Action modes:
+#   box            Box(-1, 1, (2,)): club and aim angle, both continuous
+#   multidiscrete  MultiDiscrete([clubs, angle bins]): club and aim angle bin
+#   hybrid         Tuple(Discrete(clubs), Box(-1, 1, (1,))): discrete club, continuous angle. stable baselines does
+#                  not support Tuple action spaces, this mode is meant for custom agents and planners
+# -------------------------------------------------------------------------------------
+
+# import packages
+import math
+import numpy as np
+from gymnasium import spaces
+
+ACTION_MODES = ("box", "multidiscrete", "hybrid")
+
+class ActionDecoder:
+    def __init__(self, mode="box", num_clubs=14, num_angle_bins=72):
+        if mode not in ACTION_MODES:
+            raise ValueError("Unknown action mode {}, expected one of {}".format(mode, ACTION_MODES))
+        self.mode = mode
+        self.num_clubs = num_clubs
+        self.num_angle_bins = num_angle_bins
+
+        if mode == "box":
+            self.space = spaces.Box(low=-1, high=1, shape=(2,), dtype=np.float32)
+        elif mode == "multidiscrete":
+            self.space = spaces.MultiDiscrete([num_clubs, num_angle_bins])
+        else:
+            self.space = spaces.Tuple((spaces.Discrete(num_clubs), spaces.Box(low=-1, high=1, shape=(1,), dtype=np.float32)))
+
+    def decode(self, actions):
+        # returns the club indices and the aim angles (radians, on screen) of an action or of a batch of actions.
+        # box and multidiscrete batches have shape (..., 2), hybrid batches are a (clubs, angles) pair of arrays
+        if self.mode == "box":
+            actions = np.asarray(actions, dtype=np.float64)
+            # split [-1, 1] into num_clubs equal bins, an action of exactly 1 belongs to the last club
+            clubs = np.minimum(((actions[..., 0] + 1) * (self.num_clubs / 2)).astype(int), self.num_clubs - 1)
+            angles = (actions[..., 1] + 1) * np.pi
+        elif self.mode == "multidiscrete":
+            actions = np.asarray(actions)
+            clubs = actions[..., 0].astype(int)
+            angles = actions[..., 1] * (2 * np.pi / self.num_angle_bins)
+        else:
+            clubs = np.asarray(actions[0]).astype(int)
+            angles = (np.asarray(actions[1], dtype=np.float64)[..., 0] + 1) * np.pi
+
+        # actions slightly outside of the space (e.g. unclipped policy outputs) are clamped to the nearest club
+        clubs = np.clip(clubs, 0, self.num_clubs - 1)
+        return clubs, angles
+
+    def decode_single(self, action):
+        # same as decode for one action, with plain Python arithmetic since NumPy overhead dominates at this size
+        if self.mode == "box":
+            club = int((float(action[0]) + 1) * (self.num_clubs / 2))
+            angle = (float(action[1]) + 1) * math.pi
+        elif self.mode == "multidiscrete":
+            club = int(action[0])
+            angle = int(action[1]) * (2 * math.pi / self.num_angle_bins)
+        else:
+            club = int(action[0])
+            angle = (float(action[1][0]) + 1) * math.pi
+        return min(max(club, 0), self.num_clubs - 1), angle
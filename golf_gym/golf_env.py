@@ -0,0 +1,147 @@
+# ------------------------------------------------------------------------------------
+# File: golf_env.py
+# Authors: Guinness
+# Date: 06/04/2024
+# Description: This file contains the implementation of the GolfGameEnv class, which is a custom Gymnasium environment
+# The environment runs on the headless GolfSim, pygame is only loaded once render() is called.
+# -------------------------------------------------------------------------------------
+
+# import functions and classes
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+from golf.sim import GolfSim
+from golf.constants import SCREEN_WIDTH, SCREEN_HEIGHT, LIES, DEFAULT_PROFILE
+from golf.course_library import MAX_COURSE_ID
+from .actions import ActionDecoder
+
+class GolfGameEnv(gym.Env):
+    def __init__(self, player_profile=DEFAULT_PROFILE, course_profile=None, screen=None, action_mode="box", num_angle_bins=72,
+                 observation_mode="image", roll=False, prefetch=0):
+        super().__init__()
+        self.game = None
+        # save player and course profiles
+        self.player_profile = player_profile
+        self.course_profile = course_profile
+        self.screen = screen
+
+        # the simulation holds the course, the ball and the score. with roll=True balls roll after landing, and with
+        # prefetch > 0 up to that many courses are generated ahead of resets in a background process
+        self.sim = GolfSim(player_profile, roll=roll, prefetch=prefetch)
+
+        # define action and observation spaces and reward range. see actions.py for the available action modes
+        self.action_decoder = ActionDecoder(action_mode, num_clubs=len(self.sim.clubs), num_angle_bins=num_angle_bins)
+        self.action_space = self.action_decoder.space
+
+        # the course is observed either as an image, or as a course id whose encoding is cached by the policy
+        # (see rl/features.py), so that per-step observations only carry the small dynamic part
+        if observation_mode not in ("image", "course_id"):
+            raise ValueError("Unknown observation mode {}, expected 'image' or 'course_id'".format(observation_mode))
+        self.observation_mode = observation_mode
+        if observation_mode == "image":
+            course_space = spaces.Box(low=0, high=255, shape=(SCREEN_WIDTH, SCREEN_HEIGHT, 3), dtype=np.uint8)
+        else:
+            course_space = spaces.Box(low=0, high=MAX_COURSE_ID - 1, shape=(1,), dtype=np.int64)
+
+        self. observation_space = spaces.Dict({
+            "ball_position": spaces.Box(low=np.array([0, 0]), high=np.array([SCREEN_WIDTH, SCREEN_HEIGHT]), shape=(2,), dtype=np.int64),
+            "lie": spaces.Box(low=0, high=1, shape=(4,), dtype=np.int64),
+            "course" if observation_mode == "image" else "course_id": course_space,
+        })
+        self.reward_range = (0, np.inf)
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        # the simulation draws courses and shots from the environment's generator. options can fix the course
+        # ("course_id") and the standard normal noise of the shots ("shot_noise", see GolfSim.reset)
+        options = options or {}
+        self.sim.np_random = self.np_random
+        course_id = options.get("course_id")
+        if course_id is None and seed is not None:
+            # like seeded GolfSim resets, seeded resets do not take their course from the prefetch queue
+            course_id = self.sim.library.sample_id(self.np_random)
+        self.sim.reset(course_id=course_id, shot_noise=options.get("shot_noise"))
+
+        return self._get_obs("Teebox"), {}
+
+    def step(self, action):
+        # decode the action into a club and an aim angle
+        club_index, direction = self.action_decoder.decode_single(action)
+
+        club = self.sim.clubs[club_index]
+
+        # hit the ball and observe where it landed
+        landing, next_lie, reward, terminated, truncated = self.sim.step(club, direction)
+        info = {"club": club_index, "aim": direction, "landing": landing, "landing_lie": next_lie}
+
+        return self._get_obs(next_lie), reward, terminated, truncated, info
+
+    def get_state(self):
+        # compact, immutable snapshot of the episode (see GolfSim.get_state)
+        return self.sim.get_state()
+
+    def set_state(self, state):
+        # restore a snapshot taken with get_state and return the observation of the restored state
+        self.sim.set_state(state)
+        return self._get_obs(state.lie)
+
+    def _get_obs(self, lie_name):
+        # construct a one hot encoding of the lie
+        lie = np.zeros(4, dtype=np.int64)
+        if lie_name in LIES:
+            lie[LIES.index(lie_name)] = 1
+
+        # construct the observation object
+        observation = {
+            "ball_position": self.sim.ball_pos.astype(np.int64),
+            "lie": lie,
+        }
+        if self.observation_mode == "image":
+            # a copy, so that observations never alias the course (or each other)
+            observation["course"] = self.sim.course.image.copy()
+        else:
+            observation["course_id"] = np.array([self.sim.course_id], dtype=np.int64)
+        return observation
+
+    def render(self):
+        if self.sim.prev_pos is None:
+            return
+
+        import pygame
+        game = self._get_game()
+        clock = pygame.time.Clock()
+
+        # show the course, club and score of the simulation
+        if game.course is not self.sim.course:
+            game.reset_game(course=self.sim.course)
+        game.score = self.sim.score
+        game.current_lie = self.sim.lie
+        game.aiming_system.change_club(self.sim.club)
+        game.aiming_system.set_lie(self.sim.shot_lie)
+
+        # animate the ball moving from the previous position to the current position
+        next_pos = tuple(self.sim.ball_pos)
+        game.ball.x, game.ball.y = self.sim.prev_pos[0], self.sim.prev_pos[1]
+        game.ball.start_animation(next_pos, self.sim.prev_target)
+        game.ball.animate_path(game.screen, clock, game.course, game.aiming_system, game.button_rect, game.font, game.score, game.current_lie)
+
+        # move the ball back to the current position
+        game.ball.move_to(*next_pos)
+
+    def _get_game(self):
+        # the pygame window, fonts and UI are only created the first time the environment is rendered
+        if self.game is None:
+            import pygame
+            from golf.game import Game
+            pygame.init()
+            if self.screen is None:
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.game = Game(self.screen, self.player_profile, course=self.sim.course)
+        return self.game
+
+    def close(self):
+        self.sim.close()
+        if self.game is not None:
+            import pygame
+            pygame.quit()
+            self.game = None
@@ -0,0 +1,18 @@
+from golf_gym.golf_env import GolfGameEnv
+from golf.constants import DEFAULT_PROFILE
+
+env = GolfGameEnv(player_profile=DEFAULT_PROFILE, course_profile="golf/course.json")
+env.reset()
+
+while True:
+    action = env.action_space.sample()
+    observation, reward, terminated, truncated, _ = env.step(action)
+
+    env.render()
+    if terminated:
+        break
+
+    if truncated:
+        env.reset()
+
+env.close()
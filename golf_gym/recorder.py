@@ -0,0 +1,53 @@
+# ------------------------------------------------------------------------------------
+# File: recorder.py
+# Description: This file contains the RecordRollouts wrapper, which records every transition of a GolfGameEnv
+# (course id, ball position, lie, club, aim, sampled landing, reward) into a columnar RolloutWriter. Only the course
+# id is stored, the course itself can be rebuilt from it with the course library.
+#
+# Usage:
+#   env = RecordRollouts(GolfGameEnv(), "rollouts/run_0")
+#   ...
+#   env.close()
+#   reader = RolloutReader("rollouts/run_0")
+# -------------------------------------------------------------------------------------
+
+# import packages
+import math
+import gymnasium as gym
+from golf.constants import TERRAIN_IDS
+from golf.rollouts import RolloutWriter
+
+class RecordRollouts(gym.Wrapper):
+    def __init__(self, env, directory, chunk_size=65536):
+        super().__init__(env)
+        sim = env.unwrapped.sim
+        self.writer = RolloutWriter(directory, chunk_size=chunk_size, par=sim.par, difficulty=sim.difficulty, clubs=sim.clubs)
+        # episode ids continue after the episodes already recorded in the directory
+        self.episode = self.writer.next_episode - 1
+        self.step_index = 0
+
+    def reset(self, **kwargs):
+        self.episode += 1
+        self.step_index = 0
+        return self.env.reset(**kwargs)
+
+    def step(self, action):
+        # read the state the shot is played from before stepping
+        sim = self.env.unwrapped.sim
+        course_id, ball_x, ball_y, lie = sim.course_id, sim.ball_pos[0], sim.ball_pos[1], sim.lie
+
+        observation, reward, terminated, truncated, info = self.env.step(action)
+
+        landing = info["landing"]
+        self.writer.append((
+            self.episode, self.step_index, course_id, ball_x, ball_y, TERRAIN_IDS[lie],
+            info["club"], info["aim"] % (2 * math.pi), landing[0], landing[1], TERRAIN_IDS[info["landing_lie"]],
+            reward, terminated, truncated,
+        ))
+        self.step_index += 1
+
+        return observation, reward, terminated, truncated, info
+
+    def close(self):
+        self.writer.close()
+        super().close()
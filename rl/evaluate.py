@@ -0,0 +1,109 @@
+# ------------------------------------------------------------------------------------
+# File: evaluate.py
+# Description: This file evaluates and compares golf policies with common random numbers. Every policy plays the
+# same courses, and the n-th shot on a course uses the same pre-drawn standard normal noise for every policy. That
+# noise is transformed by the covariance of each policy's own club and aim. Score differences between policies are
+# then estimated from paired episodes, whose variance is much lower than the variance of independent runs, so
+# checkpoints can be ranked with far fewer simulated episodes.
+#
+# Usage:
+#   python -m rl.evaluate rl/ppo_golf checkpoints/ppo_golf_2 random --courses 200 --seed 0
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import numpy as np
+from golf_gym.golf_env import GolfGameEnv
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def as_policy(model):
+    # accept stable baselines models (or anything with the same predict method, like PolicyClient) and plain
+    # callables mapping an observation to an action
+    if hasattr(model, "predict"):
+        return lambda observation: model.predict(observation, deterministic=True)[0]
+    return model
+
+def observation_mode_of(policies):
+    # observation mode the models were trained with ("course_id" or "image"), read from their observation spaces.
+    # plain callables do not say, and default to the mode of train.py
+    for model in policies.values():
+        spaces = getattr(getattr(model, "observation_space", None), "spaces", {})
+        if "course_id" in spaces:
+            return "course_id"
+        if "course" in spaces:
+            return "image"
+    return "course_id"
+
+def play_episode(env, policy, course_id, shot_noise):
+    # play one hole and return the score
+    observation, _ = env.reset(options={"course_id": course_id, "shot_noise": shot_noise})
+    while True:
+        observation, reward, terminated, truncated, _ = env.step(policy(observation))
+        if terminated or truncated:
+            return env.unwrapped.sim.score
+
+def evaluate_policies(policies, num_courses=200, seed=0, max_shots=32, env=None):
+    # play every policy (a dict of name -> model or callable) on the same courses with the same shot noise.
+    # returns a dict of name -> array of scores, aligned by course
+    env = env if env is not None else GolfGameEnv(observation_mode=observation_mode_of(policies))
+    policies = {name: as_policy(model) for name, model in policies.items()}
+    rng = np.random.default_rng(seed)
+
+    scores = {name: np.empty(num_courses) for name in policies}
+    for i in range(num_courses):
+        # draw the scenario once, then let every policy play it (each course is only generated once)
+        course_id = env.unwrapped.sim.library.sample_id(rng)
+        shot_noise = rng.standard_normal((max_shots, 2))
+        for name, policy in policies.items():
+            scores[name][i] = play_episode(env, policy, course_id, shot_noise)
+    return scores
+
+def compare(scores, baseline=None):
+    # rank the policies by mean score (lower is better) and compare each one to the baseline (the best policy by
+    # default). returns rows of (name, mean score, mean difference, paired standard error, unpaired standard error)
+    names = sorted(scores, key=lambda name: scores[name].mean())
+    baseline = baseline if baseline is not None else names[0]
+    reference = scores[baseline]
+    n = len(reference)
+
+    rows = []
+    for name in names:
+        difference = scores[name] - reference
+        paired_se = difference.std(ddof=1) / np.sqrt(n) if n > 1 else np.nan
+        unpaired_se = np.sqrt((scores[name].var(ddof=1) + reference.var(ddof=1)) / n) if n > 1 else np.nan
+        rows.append((name, scores[name].mean(), difference.mean(), paired_se, unpaired_se))
+    return rows
+
+def print_comparison(rows):
+    print(f"{'policy':<30} {'score':>8} {'diff':>8} {'paired se':>10} {'indep. se':>10}")
+    for name, mean, difference, paired_se, unpaired_se in rows:
+        print(f"{name:<30} {mean:8.3f} {difference:8.3f} {paired_se:10.3f} {unpaired_se:10.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare golf policies with common random numbers.")
+    parser.add_argument("models", nargs="+", help="paths of saved PPO models, or 'random'")
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=None)
+    args = parser.parse_args()
+
+    from stable_baselines3 import PPO
+
+    policies = {}
+    for path in args.models:
+        if path == "random":
+            policies[path] = lambda observation: env.action_space.sample()
+        else:
+            policies[path] = PPO.load(path)
+    # all models are played in the same environment, so they must share an observation mode
+    env = GolfGameEnv(observation_mode=observation_mode_of(policies))
+
+    scores = evaluate_policies(policies, num_courses=args.courses, seed=args.seed, env=env)
+    print_comparison(compare(scores, baseline=args.baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ------------------------------------------------------------------------------------
+# File: features.py
+# Description: This file contains the CourseCacheExtractor, a stable baselines features extractor for GolfGameEnv
+# with observation_mode="course_id". The course only changes at reset, so instead of re-encoding the course image
+# on every step, the extractor looks the course up by id and encodes it once:
+#   - without gradients (rollout collection, predict), embeddings are cached per course id
+#   - with gradients (training), every distinct course of the minibatch is encoded once, and the cache is cleared
+#     because the weights are about to change
+#   - the cache is also cleared when weights are loaded or modified in place (e.g. copied from another policy)
+# The per-step input is only the ball position, the lie and the course id.
+#
+# Usage:
+#   env = GolfGameEnv(observation_mode="course_id")
+#   model = PPO("MultiInputPolicy", env, policy_kwargs={"features_extractor_class": CourseCacheExtractor})
+# -------------------------------------------------------------------------------------
+
+# import packages
+import collections
+import torch as th
+from torch import nn
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+from golf.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from golf.course_library import CourseLibrary
+
+class CourseCacheExtractor(BaseFeaturesExtractor):
+    def __init__(self, observation_space, course_features_dim=256, downsample=4, par=4, difficulty=2, image_cache_size=64):
+        num_dynamic = observation_space["ball_position"].shape[0] + observation_space["lie"].shape[0]
+        super().__init__(observation_space, features_dim=course_features_dim + num_dynamic)
+
+        # the courses are rebuilt from their ids
+        self.library = CourseLibrary(par=par, difficulty=difficulty, cache_size=image_cache_size)
+
+        # NatureCNN-style encoder, applied to the course image downsampled by average pooling
+        self.cnn = nn.Sequential(
+            nn.AvgPool2d(downsample),
+            nn.Conv2d(3, 32, kernel_size=8, stride=4),
+            nn.ReLU(),
+            nn.Conv2d(32, 64, kernel_size=4, stride=2),
+            nn.ReLU(),
+            nn.Conv2d(64, 64, kernel_size=3, stride=1),
+            nn.ReLU(),
+            nn.Flatten(),
+        )
+        with th.no_grad():
+            num_flat = self.cnn(th.zeros(1, 3, SCREEN_WIDTH, SCREEN_HEIGHT)).shape[1]
+        self.linear = nn.Sequential(nn.Linear(num_flat, course_features_dim), nn.ReLU())
+
+        # course id -> embedding computed with the current weights, and course id -> image tensor
+        self.embeddings = {}
+        self.weight_versions = None
+        self.images = collections.OrderedDict()
+        self.image_cache_size = image_cache_size
+
+    def course_image(self, course_id, device):
+        image = self.images.get(course_id)
+        if image is None or image.device != device:
+            # (width, height, 3) uint8 -> (3, width, height) on the policy's device
+            image = th.tensor(self.library.get(course_id).image, device=device).permute(2, 0, 1).contiguous()
+            self.images[course_id] = image
+            while len(self.images) > self.image_cache_size:
+                self.images.popitem(last=False)
+        self.images.move_to_end(course_id)
+        return image
+
+    def encode_courses(self, course_ids, device):
+        images = th.stack([self.course_image(course_id, device) for course_id in course_ids]).float() / 255
+        return self.linear(self.cnn(images))
+
+    def forward(self, observations):
+        ids = observations["course_id"].view(-1).long()
+        unique_ids, inverse = th.unique(ids, return_inverse=True)
+        course_ids = unique_ids.tolist()
+        device = ids.device
+
+        if th.is_grad_enabled():
+            # training: the weights change after this step, so cached embeddings become stale
+            self.embeddings.clear()
+            course_features = self.encode_courses(course_ids, device)
+        else:
+            # in-place updates of the weights (even without gradients) bump the versions of their tensors
+            weight_versions = tuple(parameter._version for parameter in self.parameters())
+            if weight_versions != self.weight_versions:
+                self.embeddings.clear()
+                self.weight_versions = weight_versions
+            missing = [course_id for course_id in course_ids if course_id not in self.embeddings]
+            if missing:
+                for course_id, features in zip(missing, self.encode_courses(missing, device)):
+                    self.embeddings[course_id] = features
+            course_features = th.stack([self.embeddings[course_id] for course_id in course_ids])
+
+        # the dynamic part of the observation: normalized ball position and the one hot lie
+        scale = th.tensor([SCREEN_WIDTH, SCREEN_HEIGHT], dtype=th.float32, device=device)
+        ball_position = observations["ball_position"].float() / scale
+        lie = observations["lie"].float()
+        return th.cat([course_features[inverse], ball_position, lie], dim=1)
+
+    def train(self, mode=True):
+        # switching between training and evaluation may change the weights' behaviour, start from a clean cache
+        self.embeddings.clear()
+        return super().train(mode)
+
+    def _load_from_state_dict(self, *args, **kwargs):
+        # called by load_state_dict (of this extractor or of the policy containing it): new weights, new embeddings
+        self.embeddings.clear()
+        super()._load_from_state_dict(*args, **kwargs)
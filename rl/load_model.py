@@ -1,16 +1,9 @@
-import gymnasium as gym
 from stable_baselines3 import PPO
-import pygame
-import sys
-sys.path.append('/Users/guinnesschen/Desktop/234_final/gymnasium')
-from golf_env import GolfGameEnv
-sys.path.append('/Users/guinnesschen/Desktop/234_final/golf')
-from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from golf_gym.golf_env import GolfGameEnv
+from golf.constants import DEFAULT_PROFILE
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-env = GolfGameEnv(player_profile="golf/profile.json", course_profile="golf/course.json", screen=screen)
+env = GolfGameEnv(player_profile=DEFAULT_PROFILE, course_profile="golf/course.json", observation_mode="course_id")
 observation, _ = env.reset()
-pygame.init()
 
 print('loading model...')
 model = PPO.load("rl/ppo_golf")
@@ -25,6 +18,4 @@ while True:
     if truncated:
         env.reset()
 
-pygame.quit()
-
-
+env.close()
@@ -0,0 +1,308 @@
+# ------------------------------------------------------------------------------------
+# File: serve.py
+# Description: This file contains a local inference service for trained golf policies. The PolicyServer loads a PPO
+# model once and micro-batches observation requests coming from many clients (pygame games, simulated players) into
+# single forward passes. Clients talk to it over a Unix socket or localhost TCP through the PolicyClient class.
+#
+# Usage:
+#   python -m rl.serve --model rl/ppo_golf --unix /tmp/golf_policy.sock
+#   python -m rl.serve --model rl/ppo_golf --port 8765 --max-batch-size 128 --max-latency-ms 2
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import asyncio
+import collections
+import json
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# every message is two big-endian lengths (json header, raw body) followed by the header and the body
+PREFIX = struct.Struct("!II")
+
+# ---------------
+# Wire format
+# ---------------
+
+def encode_message(header, arrays=None):
+    # the header describes the dtype and shape of every array, the body holds their raw bytes back to back
+    arrays = arrays or {}
+    meta = {}
+    buffers = []
+    for key, value in arrays.items():
+        value = np.ascontiguousarray(value)
+        meta[key] = [value.dtype.str, list(value.shape)]
+        buffers.append(value.tobytes())
+    header_bytes = json.dumps(dict(header, arrays=meta)).encode()
+    body = b"".join(buffers)
+    return PREFIX.pack(len(header_bytes), len(body)) + header_bytes + body
+
+def decode_message(header_bytes, body):
+    header = json.loads(header_bytes)
+    arrays = {}
+    offset = 0
+    for key, (dtype, shape) in header.pop("arrays").items():
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        arrays[key] = np.frombuffer(body, dtype=dtype, count=size // dtype.itemsize, offset=offset).reshape(shape)
+        offset += size
+    return header, arrays
+
+async def read_message(reader):
+    header_length, body_length = PREFIX.unpack(await reader.readexactly(PREFIX.size))
+    header_bytes = await reader.readexactly(header_length)
+    body = await reader.readexactly(body_length)
+    return decode_message(header_bytes, body)
+
+# ---------------
+# Class Definitions
+# ---------------
+
+class Request:
+    __slots__ = ("observation", "deterministic", "future", "arrival")
+
+    def __init__(self, observation, deterministic, future):
+        self.observation = observation
+        self.deterministic = deterministic
+        self.future = future
+        self.arrival = time.perf_counter()
+
+
+class PolicyServer:
+    def __init__(self, model, max_batch_size=64, max_latency_ms=2.0, deterministic=True, report_interval=10.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.deterministic = deterministic
+        self.report_interval = report_interval
+
+        # pending requests, oldest first, and an event that wakes the batcher when a new one arrives
+        self.pending = collections.deque()
+        self.arrival = None
+
+        # the forward pass runs on a single worker thread so the event loop keeps accepting requests meanwhile
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # rolling statistics
+        self.latencies = collections.deque(maxlen=10_000)
+        self.batch_sizes = collections.deque(maxlen=1_000)
+        self.num_requests = 0
+        self.num_batches = 0
+
+    async def serve(self, unix_path=None, host="127.0.0.1", port=8765):
+        self.arrival = asyncio.Event()
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host=host, port=port)
+
+        tasks = [asyncio.create_task(self.batch_loop())]
+        if self.report_interval:
+            tasks.append(asyncio.create_task(self.report_loop()))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.executor.shutdown(wait=False)
+
+    async def handle_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                header, arrays = await read_message(reader)
+
+                if header["op"] == "predict":
+                    # clients may ask for deterministic or sampled actions, otherwise the server's default applies
+                    deterministic = header.get("deterministic")
+                    request = Request(arrays, self.deterministic if deterministic is None else bool(deterministic),
+                                      loop.create_future())
+                    self.pending.append(request)
+                    self.arrival.set()
+                    try:
+                        action = await request.future
+                        writer.write(encode_message({"op": "action"}, {"action": action}))
+                    except Exception as error:
+                        writer.write(encode_message({"op": "error", "message": repr(error)}))
+
+                elif header["op"] == "stats":
+                    writer.write(encode_message(dict(op="stats", **self.stats())))
+
+                else:
+                    writer.write(encode_message({"op": "error", "message": f"unknown op {header['op']!r}"}))
+
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            # the client disconnected
+            pass
+        finally:
+            writer.close()
+
+    async def next_batch(self):
+        # wait for the first request
+        while not self.pending:
+            self.arrival.clear()
+            await self.arrival.wait()
+
+        # keep collecting until the batch is full or the oldest request has used up its latency budget
+        deadline = self.pending[0].arrival + self.max_latency
+        while len(self.pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self.arrival.clear()
+            try:
+                await asyncio.wait_for(self.arrival.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        batch_size = min(len(self.pending), self.max_batch_size)
+        return [self.pending.popleft() for _ in range(batch_size)]
+
+    async def batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.next_batch()
+            # one forward pass per kind of request (deterministic or sampled) in the batch
+            for deterministic in (True, False):
+                group = [request for request in batch if request.deterministic == deterministic]
+                if not group:
+                    continue
+                try:
+                    actions = await loop.run_in_executor(self.executor, self.predict_batch,
+                                                         [request.observation for request in group], deterministic)
+                except Exception as error:
+                    actions = [error] * len(group)
+
+                # a client which went away may have cancelled its future, which must not stop the loop for the others
+                now = time.perf_counter()
+                for request, action in zip(group, actions):
+                    if request.future.done():
+                        continue
+                    if isinstance(action, Exception):
+                        request.future.set_exception(action)
+                    else:
+                        request.future.set_result(action)
+                    self.latencies.append(now - request.arrival)
+            self.num_requests += len(batch)
+            self.num_batches += 1
+            self.batch_sizes.append(len(batch))
+
+    def predict_batch(self, observations, deterministic):
+        # stack the per-client observations along a new batch dimension and run one forward pass
+        if isinstance(observations[0], dict) and set(observations[0]) != {"observation"}:
+            batch = {key: np.stack([observation[key] for observation in observations]) for key in observations[0]}
+        else:
+            batch = np.stack([observation["observation"] for observation in observations])
+        actions, _ = self.model.predict(batch, deterministic=deterministic)
+        return actions
+
+    async def report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            stats = self.stats()
+            print(f"requests: {stats['requests']}  queue depth: {stats['queue_depth']}  "
+                  f"mean batch: {stats['mean_batch_size']:.1f}  "
+                  f"p50: {stats['p50_latency_ms']:.2f} ms  p99: {stats['p99_latency_ms']:.2f} ms")
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "requests": self.num_requests,
+            "batches": self.num_batches,
+            "queue_depth": len(self.pending),
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            "p50_latency_ms": float(np.percentile(latencies, 50)),
+            "p99_latency_ms": float(np.percentile(latencies, 99)),
+        }
+
+
+class PolicyClient:
+    # a blocking client which can be used in place of model.predict by games and simulated players.
+    # address is either a Unix socket path or a (host, port) tuple
+    def __init__(self, address):
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(address)
+
+    def predict(self, observation, deterministic=None):
+        # mirror the stable baselines signature so the client can stand in for a loaded model.
+        # deterministic=None leaves the choice to the server (see --stochastic)
+        if not isinstance(observation, dict):
+            observation = {"observation": observation}
+        header = {"op": "predict"}
+        if deterministic is not None:
+            header["deterministic"] = bool(deterministic)
+        header, arrays = self.request(header, observation)
+        return arrays["action"], None
+
+    def stats(self):
+        header, _ = self.request({"op": "stats"})
+        return header
+
+    def request(self, header, arrays=None):
+        self.sock.sendall(encode_message(header, arrays))
+        header_length, body_length = PREFIX.unpack(self.recv_exactly(PREFIX.size))
+        header, arrays = decode_message(self.recv_exactly(header_length), self.recv_exactly(body_length))
+        if header["op"] == "error":
+            raise RuntimeError(header["message"])
+        return header, arrays
+
+    def recv_exactly(self, size):
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            n = self.sock.recv_into(view[received:])
+            if n == 0:
+                raise ConnectionError("policy server closed the connection")
+            received += n
+        return bytes(buffer)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# ---------------
+# Entry point
+# ---------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a trained golf policy to many local clients.")
+    parser.add_argument("--model", default="rl/ppo_golf")
+    parser.add_argument("--unix", default=None, help="path of the Unix socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    parser.add_argument("--stochastic", action="store_true", help="sample actions instead of taking the mode, unless a request says otherwise")
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # only the server needs stable baselines (and torch), clients just need numpy
+    from stable_baselines3 import PPO
+
+    print('loading model...')
+    model = PPO.load(args.model)
+    server = PolicyServer(model, max_batch_size=args.max_batch_size, max_latency_ms=args.max_latency_ms,
+                          deterministic=not args.stochastic, report_interval=args.report_interval)
+
+    print(f"serving on {args.unix or f'{args.host}:{args.port}'}")
+    asyncio.run(server.serve(unix_path=args.unix, host=args.host, port=args.port))
+
+
+if __name__ == "__main__":
+    main()
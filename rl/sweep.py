@@ -0,0 +1,205 @@
+# ------------------------------------------------------------------------------------
+# File: sweep.py
+# Description: This file runs hyperparameter sweeps of PPO on the golf environment. Configurations come from a
+# grid or from random search over a search space, and trials are trained in a process pool capped by the number of
+# cores, each with its own seeded headless environment. Successive halving stops underperforming trials early:
+# all trials are trained for a small budget, the best 1/eta of them are trained further (eta times the budget),
+# and so on. Trials are ranked with common random numbers (see evaluate.py), and every rung of every trial is
+# appended to a results table (results.csv). Sweeping again into the same directory adds new trials after the
+# existing ones, so earlier checkpoints and results are kept.
+#
+# Search spaces are JSON objects mapping PPO arguments to a list of values (grid or random choice) or, for random
+# search only, to {"low": ..., "high": ..., "log": true} ranges.
+#
+# Usage:
+#   python -m rl.sweep --directory sweeps/ppo --search random --samples 32 --min-timesteps 2000 --rungs 4
+# -------------------------------------------------------------------------------------
+
+# import packages
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# values around the hard-coded settings of train.py
+DEFAULT_SPACE = {
+    "n_steps": [8, 32, 128],
+    "batch_size": [8, 32],
+    "learning_rate": [1e-4, 3e-4, 1e-3],
+    "gamma": [0.99, 0.999],
+}
+
+RESULT_FIELDS = ["trial", "rung", "timesteps", "mean_score", "score_se", "seconds", "seed", "config"]
+
+# ---------------
+# Function Definitions
+# ---------------
+
+def grid_configs(space):
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+def random_configs(space, num_samples, rng):
+    configs = []
+    for _ in range(num_samples):
+        config = {}
+        for key in sorted(space):
+            values = space[key]
+            if isinstance(values, dict):
+                low, high = values["low"], values["high"]
+                if values.get("log", False):
+                    config[key] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    config[key] = float(rng.uniform(low, high))
+            else:
+                config[key] = values[rng.integers(len(values))]
+                # keep plain Python types so that configs can be written as JSON
+                config[key] = config[key].item() if isinstance(config[key], np.generic) else config[key]
+        configs.append(config)
+    return configs
+
+def is_valid(config):
+    # a minibatch cannot be larger than the rollout buffer
+    return config.get("batch_size", 64) <= config.get("n_steps", 2048)
+
+def first_trial(results_path):
+    # number of the first new trial: trials already in the results table keep their numbers and checkpoints
+    if not os.path.exists(results_path):
+        return 0
+    with open(results_path, "r", newline="") as file:
+        return max((int(row["trial"]) + 1 for row in csv.DictReader(file)), default=0)
+
+def run_trial(task):
+    # train one trial up to its budget for this rung (continuing from its checkpoint) and evaluate it.
+    # runs in a worker process, torch is only imported here
+    import torch
+    from stable_baselines3 import PPO
+    from golf_gym.golf_env import GolfGameEnv
+    from rl.evaluate import evaluate_policies
+    from rl.features import CourseCacheExtractor
+
+    # trials run side by side, one core each
+    torch.set_num_threads(1)
+    start = time.perf_counter()
+
+    env = GolfGameEnv(observation_mode="course_id")
+    env.reset(seed=task["seed"])
+    path = os.path.join(task["directory"], "trial_{:04d}".format(task["trial"]))
+    if task["timesteps_done"] == 0:
+        model = PPO("MultiInputPolicy", env, seed=task["seed"], verbose=0,
+                    policy_kwargs={"features_extractor_class": CourseCacheExtractor}, **task["config"])
+    else:
+        model = PPO.load(path, env=env)
+    model.learn(total_timesteps=task["timesteps"] - task["timesteps_done"], reset_num_timesteps=False)
+    model.save(path)
+
+    # every trial is evaluated on the same courses and shot noise
+    scores = evaluate_policies({"trial": model}, num_courses=task["eval_courses"], seed=task["eval_seed"],
+                               env=GolfGameEnv(observation_mode="course_id"))["trial"]
+    return {
+        "trial": task["trial"],
+        "rung": task["rung"],
+        "timesteps": task["timesteps"],
+        "mean_score": float(scores.mean()),
+        "score_se": float(scores.std(ddof=1) / np.sqrt(len(scores))) if len(scores) > 1 else float("nan"),
+        "seconds": time.perf_counter() - start,
+        "seed": task["seed"],
+        "config": json.dumps(task["config"]),
+    }
+
+def sweep(configs, directory, min_timesteps=2000, eta=2, num_rungs=3, workers=None, seed=0, eval_courses=50):
+    # run successive halving over the configs and return the rows of the results table
+    if not configs:
+        return []
+    os.makedirs(directory, exist_ok=True)
+    workers = min(workers or os.cpu_count(), os.cpu_count(), len(configs))
+    results_path = os.path.join(directory, "results.csv")
+    write_header = not os.path.exists(results_path)
+
+    # trials are numbered after those of earlier sweeps in the same directory
+    start = first_trial(results_path)
+    configs = {start + index: config for index, config in enumerate(configs)}
+    alive = list(configs)
+    timesteps_done = {trial: 0 for trial in alive}
+    rows = []
+
+    # spawned workers start from a clean interpreter, which is cheap since the simulator only needs numpy
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, open(results_path, "a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+        if write_header:
+            writer.writeheader()
+
+        for rung in range(num_rungs):
+            budget = min_timesteps * eta**rung
+            tasks = [{
+                "trial": trial,
+                "rung": rung,
+                "config": configs[trial],
+                "timesteps": budget,
+                "timesteps_done": timesteps_done[trial],
+                "directory": directory,
+                "seed": seed + trial,
+                "eval_courses": eval_courses,
+                "eval_seed": seed,
+            } for trial in alive]
+
+            rung_rows = []
+            for row in pool.map(run_trial, tasks):
+                writer.writerow(row)
+                file.flush()
+                rung_rows.append(row)
+                timesteps_done[row["trial"]] = row["timesteps"]
+                print("rung {} trial {:4d}: score {:.3f} +- {:.3f} ({:.0f}s) {}".format(
+                    rung, row["trial"], row["mean_score"], row["score_se"], row["seconds"], row["config"]))
+            rows.extend(rung_rows)
+
+            # keep the best 1/eta of the trials (lower scores are better)
+            rung_rows.sort(key=lambda row: row["mean_score"])
+            alive = [row["trial"] for row in rung_rows[:max(1, len(rung_rows) // eta)]]
+            if len(rung_rows) == 1:
+                break
+
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep PPO hyperparameters with successive halving.")
+    parser.add_argument("--directory", default="sweeps/ppo")
+    parser.add_argument("--space", default=None, help="JSON file with the search space")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=16, help="number of random configurations")
+    parser.add_argument("--min-timesteps", type=int, default=2000)
+    parser.add_argument("--eta", type=int, default=2)
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--eval-courses", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space is not None:
+        with open(args.space, "r") as file:
+            space = json.load(file)
+
+    if args.search == "grid":
+        configs = grid_configs(space)
+    else:
+        configs = random_configs(space, args.samples, np.random.default_rng(args.seed))
+    configs = [config for config in configs if is_valid(config)]
+
+    rows = sweep(configs, args.directory, min_timesteps=args.min_timesteps, eta=args.eta, num_rungs=args.rungs,
+                 workers=args.workers, seed=args.seed, eval_courses=args.eval_courses)
+    if not rows:
+        print("no valid configurations to sweep")
+        return
+    best = min((row for row in rows if row["rung"] == max(r["rung"] for r in rows)), key=lambda row: row["mean_score"])
+    print("best trial {}: score {:.3f} with {}".format(best["trial"], best["mean_score"], best["config"]))
+
+
+if __name__ == "__main__":
+    main()
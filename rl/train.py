@@ -1,18 +1,26 @@
 from stable_baselines3.common.env_checker import check_env
-import pygame
-import sys
-sys.path.append('/Users/guinnesschen/Desktop/234_final/gymnasium')
-from golf_env import GolfGameEnv
+from golf_gym.golf_env import GolfGameEnv
+from golf.constants import DEFAULT_PROFILE
+from rl.features import CourseCacheExtractor
 from stable_baselines3 import PPO
 
-pygame.init()
-screen = pygame.display.set_mode((800, 500))
 
-env = GolfGameEnv(player_profile="golf/profile.json", course_profile="golf/course.json", screen=screen)
-check_env(env)
+def main():
+    # training is headless, no pygame window is needed. courses are observed by id and encoded once per course, and
+    # generated ahead of resets by a background process
+    env = GolfGameEnv(player_profile=DEFAULT_PROFILE, course_profile="golf/course.json", observation_mode="course_id", prefetch=8)
+    check_env(env)
 
-model = PPO("MultiInputPolicy", env, verbose=1, n_steps=8, batch_size=8)
-model.learn(total_timesteps=80_000, progress_bar=True)
+    model = PPO("MultiInputPolicy", env, verbose=1, n_steps=8, batch_size=8,
+                policy_kwargs={"features_extractor_class": CourseCacheExtractor})
+    model.learn(total_timesteps=80_000, progress_bar=True)
 
-print("Saving model...")
-model.save("ppo_golf")
\ No newline at end of file
+    print("Course prefetch:", env.sim.prefetcher.stats())
+    print("Saving model...")
+    model.save("ppo_golf")
+    env.close()
+
+
+# the course prefetch worker is spawned, and re-imports this module: everything must run behind this guard
+if __name__ == "__main__":
+    main()